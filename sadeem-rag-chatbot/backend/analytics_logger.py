@@ -5,15 +5,98 @@ Logs conversation analytics including emotions, response times,
 and message metadata for insights and debugging.
 """
 
+import atexit
+from collections import Counter, deque
+import functools
 import json
 import logging
 import os
+import queue
+import struct
+import threading
+import time
 from datetime import datetime
 from typing import Dict, Optional
 import hashlib
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from translations import Emotion
+
 logger = logging.getLogger(__name__)
 
+# Labels of a numpy scores array, in order
+_SCORE_LABELS = tuple(e.name for e in Emotion)
+
+
+def _to_builtin(obj):
+    """Convert numpy scalars and arrays for encoders without numpy support"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+if orjson is not None:
+    def _encode_line(entry: Dict) -> bytes:
+        """Serialize a log entry to one JSON line"""
+        return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY)
+    
+    _decode_line = orjson.loads
+else:
+    def _encode_line(entry: Dict) -> bytes:
+        """Serialize a log entry to one JSON line"""
+        return (json.dumps(entry, ensure_ascii=False, separators=(',', ':'), default=_to_builtin) + '\n').encode('utf-8')
+    
+    _decode_line = json.loads
+
+# Length prefix/suffix framing each MessagePack record in the binary log
+_FRAME_LENGTH = struct.Struct('<I')
+
+
+def _encode_frame(entry: Dict) -> bytes:
+    """Pack a log entry as a MessagePack record, framed by its length on both sides"""
+    payload = msgpack.packb(entry, use_bin_type=True, default=_to_builtin)
+    length = _FRAME_LENGTH.pack(len(payload))
+    return length + payload + length
+
+# Marks the end of the queue for the background writer thread
+_STOP = object()
+
+# Buffered bytes that trigger a write to disk while the writer is busy
+FLUSH_THRESHOLD_BYTES = 16 * 1024
+
+# Longest flush() waits for the writer thread, so reads never hang on a slow disk
+FLUSH_TIMEOUT_SECONDS = 1.0
+
+# Number of most recent entries covered by get_emotion_statistics
+STATS_WINDOW = 1000
+
+# Size of the blocks read backwards from the end of the log when tailing it
+TAIL_CHUNK_SIZE = 64 * 1024
+
+# Bytes written between hints to drop the log's pages from the page cache
+PAGE_CACHE_RELEASE_BYTES = 1024 * 1024
+
+
+@functools.lru_cache(maxsize=1)
+def _format_seconds(seconds: int) -> str:
+    """Format a unix timestamp (whole seconds) as a local ISO 8601 string"""
+    return datetime.fromtimestamp(seconds).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def _format_timestamp(timestamp_ns: int) -> str:
+    """Format a time.time_ns() value like datetime.isoformat(), with microseconds"""
+    seconds, remainder = divmod(timestamp_ns, 1_000_000_000)
+    return f"{_format_seconds(seconds)}.{remainder // 1000:06d}"
+
 
 class AnalyticsLogger:
     """
@@ -32,7 +115,10 @@ class AnalyticsLogger:
         self,
         log_file: str = "analytics.jsonl",
         hash_messages: bool = False,
-        enabled: bool = True
+        enabled: bool = True,
+        flush_every: int = 256,
+        queue_size: int = 10000,
+        binary_log_file: Optional[str] = None
     ):
         """
         Initialize analytics logger
@@ -41,16 +127,61 @@ class AnalyticsLogger:
             log_file: Path to analytics log file (JSON Lines format)
             hash_messages: If True, hash user messages for privacy
             enabled: If False, disable logging
+            flush_every: Maximum number of entries written per flush by the writer thread
+            queue_size: Maximum number of entries waiting to be written; extra entries are dropped
+            binary_log_file: Optional path to a length-prefixed MessagePack copy of the log,
+                used for faster reads while it holds the same history as the JSONL log
+                (requires msgpack)
         """
         self.log_file = log_file
         self.hash_messages = hash_messages
         self.enabled = enabled
+        self.flush_every = max(1, flush_every)
+        self.dropped_entries = 0
+        self.binary_log_file = None
+        self._fh = None
+        self._bin_fh = None
+        self._binary_reads = False
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer = None
+        self._unflushed_bytes = 0
+        self._uncached_bytes = 0
+        
+        # Rolling statistics over the last STATS_WINDOW entries, kept in memory
+        self._stats_lock = threading.Lock()
+        self._stats_window = deque()
+        self._global_stats = self._empty_stats()
+        self._session_stats = {}
         
         if self.enabled:
-            # Ensure log file exists
-            if not os.path.exists(self.log_file):
-                with open(self.log_file, 'w') as f:
-                    pass  # Create empty file
+            # Keep one buffered append handle open instead of reopening per message
+            self._fh = open(self.log_file, 'ab', buffering=65536)
+            
+            if binary_log_file and msgpack is None:
+                logger.warning("msgpack is not installed, binary analytics log disabled")
+            elif binary_log_file:
+                self._bin_fh = open(binary_log_file, 'ab', buffering=65536)
+                self.binary_log_file = binary_log_file
+                # The JSONL log is the durable one; only read the copy if it is complete
+                self._binary_reads = self._binary_log_matches()
+                if not self._binary_reads:
+                    logger.warning(
+                        f"{binary_log_file} does not hold the same history as {log_file}, "
+                        "reading analytics from the JSONL log"
+                    )
+            
+            # Writes happen on a daemon thread so requests never wait on disk I/O
+            self._writer = threading.Thread(
+                target=self._writer_loop,
+                name="analytics-writer",
+                daemon=True
+            )
+            self._writer.start()
+            atexit.register(self.close)
+            
+            # Rebuild the rolling statistics from what is already on disk
+            self._rebuild_stats(reversed(self.get_recent_logs(limit=STATS_WINDOW)))
             
             logger.info(f"✓ Analytics logger initialized (file: {log_file}, hashing: {hash_messages})")
         else:
@@ -71,7 +202,8 @@ class AnalyticsLogger:
         Args:
             session_id: Session identifier
             user_message: User's message text
-            emotion_data: Emotion detection result (label, confidence, scores)
+            emotion_data: Emotion detection result (label, confidence, scores).
+                `scores` may be a dict of label -> score or a numpy array of scores in Emotion order
             response_time: Time taken to generate response (seconds)
             bot_response: Bot's response (optional, can be hashed)
             metadata: Additional metadata to log
@@ -80,41 +212,67 @@ class AnalyticsLogger:
             return
         
         try:
-            # Prepare message data
-            message_hash = None
-            if self.hash_messages:
-                message_hash = self._hash_text(user_message)
-                user_message = f"[HASHED:{message_hash[:16]}]"
-            
-            # Build log entry
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'session_id': session_id,
-                'user_message': user_message,
-                'message_length': len(user_message) if not self.hash_messages else 0,
-                'emotion': {
-                    'label': emotion_data.get('label', 'Unknown'),
-                    'confidence': round(emotion_data.get('confidence', 0.0), 3),
-                    'scores': {
-                        k: round(v, 3) for k, v in emotion_data.get('scores', {}).items()
-                    }
-                },
-                'response_time_ms': round(response_time * 1000, 2),
-                'metadata': metadata or {}
-            }
+            label = emotion_data.get('label', 'Unknown')
+            confidence = round(float(emotion_data.get('confidence', 0.0)), 3)
+            response_time_ms = round(float(response_time) * 1000, 2)
             
-            if bot_response and self.hash_messages:
-                log_entry['bot_response_hash'] = self._hash_text(bot_response)[:16]
+            # Hand off the raw values; the writer thread builds, hashes and
+            # serializes the entry (JSON Lines format) off the request path
+            try:
+                self._queue.put_nowait((
+                    time.time_ns(), session_id, user_message, label, confidence,
+                    emotion_data.get('scores'), response_time_ms, bot_response, metadata
+                ))
+            except queue.Full:
+                with self._stats_lock:
+                    self.dropped_entries += 1
+                    dropped = self.dropped_entries
+                logger.warning(f"Analytics queue full, dropped entry ({dropped} total)")
+                return
             
-            # Append to log file (JSON Lines format)
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            self._record_stats((session_id, label, response_time_ms, confidence))
             
-            logger.debug(f"Logged analytics: {emotion_data.get('label')} emotion, {response_time:.2f}s")
+            logger.debug(f"Logged analytics: {label} emotion, {response_time:.2f}s")
             
         except Exception as e:
             logger.error(f"Failed to log analytics: {e}")
     
+    def _build_entry(
+        self,
+        timestamp_ns: int,
+        session_id: str,
+        user_message: str,
+        label: str,
+        confidence: float,
+        scores,
+        response_time_ms: float,
+        bot_response: Optional[str],
+        metadata: Optional[Dict]
+    ) -> Dict:
+        """Build the log entry for a queued message (runs on the writer thread)"""
+        # Prepare message data
+        if self.hash_messages:
+            user_message = f"[HASHED:{self._hash_text(user_message)}]"
+        
+        emotion = {'label': label, 'confidence': confidence}
+        if scores is not None and len(scores):
+            emotion['scores'] = self._round_scores(scores)
+        
+        log_entry = {
+            'timestamp': _format_timestamp(timestamp_ns),
+            'session_id': session_id,
+            'user_message': user_message,
+            'message_length': len(user_message) if not self.hash_messages else 0,
+            'emotion': emotion,
+            'response_time_ms': response_time_ms,
+            'metadata': metadata or {}
+        }
+        
+        if bot_response and self.hash_messages:
+            log_entry['bot_response_hash'] = self._hash_text(bot_response)
+        
+        return log_entry
+    
     def get_recent_logs(self, limit: int = 100) -> list:
         """
         Get recent log entries
@@ -129,15 +287,21 @@ class AnalyticsLogger:
             return []
         
         try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            self.flush()
             
-            # Parse JSON lines and return most recent
+            if self._binary_reads:
+                try:
+                    return [msgpack.unpackb(r, raw=False) for r in self._tail_frames(limit)]
+                except ValueError as e:  # Torn or corrupt record
+                    self._binary_reads = False
+                    logger.warning(f"{self.binary_log_file} is damaged ({e}), reading analytics from the JSONL log")
+            
+            # Parse JSON lines, most recent first
             entries = []
-            for line in reversed(lines[-limit:]):
+            for line in self._tail_lines(limit):
                 try:
-                    entries.append(json.loads(line.strip()))
-                except json.JSONDecodeError:
+                    entries.append(_decode_line(line))
+                except ValueError:  # Malformed JSON or invalid UTF-8
                     continue
             
             return entries
@@ -146,6 +310,91 @@ class AnalyticsLogger:
             logger.error(f"Failed to read analytics: {e}")
             return []
     
+    def _tail_lines(self, limit: int) -> list:
+        """
+        Read the last lines of the log file without loading all of it
+        
+        Scans backwards in fixed-size blocks and stops as soon as enough
+        lines have been collected, so the cost depends on `limit` rather
+        than on the size of the file.
+        
+        Returns:
+            Up to `limit` non-empty lines as bytes (most recent first)
+        """
+        lines = []
+        if limit <= 0:
+            return lines
+        
+        with open(self.log_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            partial = b''
+            
+            while pos > 0 and len(lines) < limit:
+                read_size = min(TAIL_CHUNK_SIZE, pos)
+                pos -= read_size
+                f.seek(pos)
+                parts = (f.read(read_size) + partial).split(b'\n')
+                
+                # The first piece may be the tail end of a line that starts in an earlier block
+                partial = parts[0]
+                for line in reversed(parts[1:]):
+                    if line.strip():
+                        lines.append(line)
+                        if len(lines) >= limit:
+                            break
+            
+            if pos == 0 and len(lines) < limit and partial.strip():
+                lines.append(partial)
+        
+        return lines
+    
+    def _tail_frames(self, limit: int) -> list:
+        """
+        Read the last records of the binary log without loading all of it
+        
+        Each record ends with its own length, so the file can be walked
+        backwards record by record without searching for separators. Both
+        copies of the length must agree and fit in the file, so a torn or
+        corrupt record raises ValueError rather than being misread.
+        
+        Returns:
+            Up to `limit` MessagePack payloads as bytes (most recent first)
+        """
+        frames = []
+        if limit <= 0:
+            return frames
+        
+        size = _FRAME_LENGTH.size
+        with open(self.binary_log_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b''
+            
+            while len(frames) < limit:
+                if len(buf) >= size:
+                    (length,) = _FRAME_LENGTH.unpack(buf[-size:])
+                    if length + 2 * size > pos + len(buf):
+                        raise ValueError("record length runs past the start of the file")
+                    if len(buf) >= length + 2 * size:
+                        start = len(buf) - length - 2 * size
+                        if buf[start:start + size] != buf[-size:]:
+                            raise ValueError("record lengths do not match")
+                        frames.append(buf[start + size:-size])
+                        buf = buf[:start]
+                        continue
+                if pos == 0:
+                    # Leftover bytes too short to be a record
+                    if buf:
+                        raise ValueError("truncated record at the start of the file")
+                    break
+                read_size = min(TAIL_CHUNK_SIZE, pos)
+                pos -= read_size
+                f.seek(pos)
+                buf = f.read(read_size) + buf
+        
+        return frames
+    
     def get_emotion_statistics(self, session_id: Optional[str] = None) -> Dict:
         """
         Get emotion statistics from logs
@@ -156,50 +405,272 @@ class AnalyticsLogger:
         Returns:
             Statistics dictionary with emotion counts and averages
         """
-        logs = self.get_recent_logs(limit=1000)
-        
-        # Filter by session if provided
-        if session_id:
-            logs = [log for log in logs if log.get('session_id') == session_id]
-        
-        if not logs:
-            return {
-                'total_messages': 0,
-                'emotion_counts': {},
-                'avg_response_time_ms': 0,
-                'avg_confidence': 0
-            }
-        
-        # Calculate statistics
-        emotion_counts = {}
-        total_response_time = 0
-        total_confidence = 0
-        
-        for log in logs:
-            emotion = log.get('emotion', {}).get('label', 'Unknown')
-            emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-            total_response_time += log.get('response_time_ms', 0)
-            total_confidence += log.get('emotion', {}).get('confidence', 0)
+        with self._stats_lock:
+            if session_id:
+                stats = self._session_stats.get(session_id)
+            else:
+                stats = self._global_stats
+            
+            if not stats or not stats['count']:
+                return {
+                    'total_messages': 0,
+                    'emotion_counts': {},
+                    'avg_response_time_ms': 0,
+                    'avg_confidence': 0
+                }
+            
+            n = stats['count']
+            emotion_counts = {k: v for k, v in stats['emotion_counts'].items() if v}
+            rt_sum = stats['rt_sum']
+            conf_sum = stats['conf_sum']
         
         return {
-            'total_messages': len(logs),
+            'total_messages': n,
             'emotion_counts': emotion_counts,
             'emotion_percentages': {
-                k: round(v / len(logs) * 100, 1) 
+                k: round(v / n * 100, 1) 
                 for k, v in emotion_counts.items()
             },
-            'avg_response_time_ms': round(total_response_time / len(logs), 2),
-            'avg_confidence': round(total_confidence / len(logs), 3),
+            'avg_response_time_ms': round(rt_sum / n, 2),
+            'avg_confidence': round(conf_sum / n, 3),
             'session_id': session_id
         }
     
+    @staticmethod
+    def _empty_stats() -> Dict:
+        """Create an empty set of rolling counters"""
+        return {'count': 0, 'rt_sum': 0.0, 'conf_sum': 0.0, 'emotion_counts': Counter()}
+    
+    @staticmethod
+    def _stats_record(entry: Dict) -> tuple:
+        """Extract the (session_id, label, response_time_ms, confidence) fields used for statistics"""
+        emotion = entry.get('emotion', {})
+        return (
+            entry.get('session_id'),
+            emotion.get('label', 'Unknown'),
+            entry.get('response_time_ms', 0),
+            emotion.get('confidence', 0)
+        )
+    
+    @staticmethod
+    def _summarize(records: list) -> Dict:
+        """Compute rolling counters for a list of records in bulk"""
+        return {
+            'count': len(records),
+            'rt_sum': float(sum(r[2] for r in records)),
+            'conf_sum': float(sum(r[3] for r in records)),
+            'emotion_counts': Counter(r[1] for r in records)
+        }
+    
+    def _rebuild_stats(self, entries):
+        """Replace the rolling statistics with those of `entries` (oldest first)"""
+        records = deque((self._stats_record(e) for e in entries), maxlen=STATS_WINDOW)
+        
+        by_session = {}
+        for record in records:
+            by_session.setdefault(record[0], []).append(record)
+        
+        with self._stats_lock:
+            self._stats_window = deque(records)
+            self._global_stats = self._summarize(records)
+            self._session_stats = {
+                session_id: self._summarize(session_records)
+                for session_id, session_records in by_session.items()
+            }
+    
+    def _record_stats(self, record: tuple):
+        """Add a (session_id, label, response_time_ms, confidence) record, evicting the oldest past STATS_WINDOW"""
+        with self._stats_lock:
+            self._stats_window.append(record)
+            self._apply_stats(record, 1)
+            if len(self._stats_window) > STATS_WINDOW:
+                self._apply_stats(self._stats_window.popleft(), -1)
+    
+    def _apply_stats(self, record: tuple, sign: int):
+        """Add (sign=1) or remove (sign=-1) a record from the global and session counters"""
+        session_id, label, response_time_ms, confidence = record
+        
+        session_stats = self._session_stats.get(session_id)
+        if session_stats is None:
+            session_stats = self._session_stats[session_id] = self._empty_stats()
+        
+        for stats in (self._global_stats, session_stats):
+            stats['count'] += sign
+            stats['rt_sum'] += sign * response_time_ms
+            stats['conf_sum'] += sign * confidence
+            stats['emotion_counts'][label] += sign
+        
+        if not session_stats['count']:
+            del self._session_stats[session_id]
+    
+    @staticmethod
+    def _round_scores(scores) -> Dict:
+        """Round emotion scores to 3 decimals as a label -> score dict (from a dict or an array in Emotion order)"""
+        items = scores.items() if isinstance(scores, dict) else zip(_SCORE_LABELS, scores)
+        return {label: round(float(score), 3) for label, score in items}
+    
     def _hash_text(self, text: str) -> str:
-        """Hash text using SHA-256"""
-        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+        """Hash text using SHA-256, returning the first 8 bytes as 16 hex characters"""
+        return hashlib.sha256(text.encode('utf-8'), usedforsecurity=False).digest()[:8].hex()
+    
+    def _writer_loop(self):
+        """Drain queued entries in batches and append them to the log file"""
+        while True:
+            try:
+                entry = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                # Idle: push out whatever is still sitting in the buffer
+                self._flush_buffer()
+                continue
+            
+            batch = []
+            waiters = []  # Events queued by flush(), set once everything before them is on disk
+            stop = False
+            
+            # Coalesce whatever else is already waiting into the same write
+            while True:
+                if entry is _STOP:
+                    stop = True
+                elif isinstance(entry, threading.Event):
+                    waiters.append(entry)
+                else:
+                    batch.append(entry)
+                if stop or len(batch) >= self.flush_every:
+                    break
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            try:
+                if batch:
+                    self._write_batch([self._build_entry(*raw) for raw in batch])
+                # Only hit the disk once enough has accumulated, or when stopping or asked to
+                if self._unflushed_bytes >= FLUSH_THRESHOLD_BYTES or stop or waiters:
+                    self._flush_buffer()
+            except Exception as e:
+                logger.error(f"Failed to write analytics: {e}")
+            finally:
+                for waiter in waiters:
+                    waiter.set()
+            
+            if stop:
+                return
+    
+    def _write_batch(self, entries: list):
+        """Append entries to the JSONL log and the binary log, so a failure in one does not lose the other"""
+        try:
+            data = b''.join([_encode_line(e) for e in entries])
+            with self._lock:
+                self._fh.write(data)
+                self._unflushed_bytes += len(data)
+        except Exception as e:
+            logger.error(f"Failed to write analytics: {e}")
+        
+        if self._bin_fh is None:
+            return
+        try:
+            frames = b''.join([_encode_frame(e) for e in entries])
+            with self._lock:
+                self._bin_fh.write(frames)
+        except Exception as e:
+            # The binary log no longer has the full history
+            self._binary_reads = False
+            logger.error(f"Failed to write binary analytics log: {e}")
+    
+    def _binary_log_matches(self) -> bool:
+        """Whether the binary log starts and ends with the same entries as the JSONL log"""
+        jsonl_size = os.path.getsize(self.log_file)
+        binary_size = os.path.getsize(self.binary_log_file)
+        if not jsonl_size or not binary_size:
+            return jsonl_size == binary_size
+        
+        try:
+            with open(self.log_file, 'rb') as f:
+                first_line = f.readline()
+            with open(self.binary_log_file, 'rb') as f:
+                (length,) = _FRAME_LENGTH.unpack(f.read(_FRAME_LENGTH.size))
+                first_frame = f.read(length)
+            last_lines = self._tail_lines(1)
+            last_frames = self._tail_frames(1)
+            return bool(last_lines and last_frames) and (
+                _decode_line(first_line) == msgpack.unpackb(first_frame, raw=False)
+                and _decode_line(last_lines[0]) == msgpack.unpackb(last_frames[0], raw=False)
+            )
+        except Exception:
+            return False
+    
+    def _flush_buffer(self):
+        """Write buffered entries to disk in a single call"""
+        with self._lock:
+            if self._unflushed_bytes and self._fh and not self._fh.closed:
+                self._fh.flush()
+                if self._bin_fh:
+                    self._bin_fh.flush()
+                self._release_page_cache(self._unflushed_bytes)
+            self._unflushed_bytes = 0
+    
+    def _release_page_cache(self, written: int):
+        """
+        Periodically tell the kernel it can drop the log file's cached pages.
+        
+        The log is append-only and rarely read back, so keeping it in the
+        page cache only adds memory pressure. Must be called with the lock held.
+        """
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        
+        self._uncached_bytes += written
+        if self._uncached_bytes < PAGE_CACHE_RELEASE_BYTES:
+            return
+        
+        try:
+            os.posix_fadvise(self._fh.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError as e:
+            logger.debug(f"posix_fadvise failed: {e}")
+        self._uncached_bytes = 0
+    
+    def flush(self, timeout: float = FLUSH_TIMEOUT_SECONDS) -> bool:
+        """
+        Wait for the entries queued so far to be written and flushed to disk
+        
+        Args:
+            timeout: Maximum number of seconds to wait for the writer thread
+            
+        Returns:
+            True if everything queued before the call was flushed in time
+        """
+        if not (self._writer and self._writer.is_alive()):
+            self._flush_buffer()
+            return True
+        
+        # The writer sets the event after writing everything queued ahead of it
+        deadline = time.monotonic() + timeout
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(max(0.0, deadline - time.monotonic()))
+    
+    def close(self):
+        """Stop the writer thread and close the log file handle"""
+        if self._writer and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._lock:
+            for fh in (self._fh, self._bin_fh):
+                if fh and not fh.closed:
+                    fh.close()
     
     def clear_logs(self):
         """Clear all analytics logs (use with caution!)"""
-        if self.enabled and os.path.exists(self.log_file):
-            with open(self.log_file, 'w') as f:
-                pass
+        if self.enabled and self._fh:
+            self.flush()
+            with self._lock:
+                self._fh.truncate(0)
+                if self._bin_fh:
+                    self._bin_fh.truncate(0)
+                    self._binary_reads = True
+            self._rebuild_stats([])
             logger.info("Analytics logs cleared")
@@ -1,20 +1,41 @@
+import atexit
 import os
+import re
+import json
 import logging
-import traceback
-from datetime import datetime
+import functools
+import hashlib
+import secrets
+import threading
+from datetime import datetime, timezone
 from typing import Dict, List, Any
 import uuid
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from transformers import pipeline
-import chromadb
-from sentence_transformers import SentenceTransformer
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer, util
 import google.generativeai as genai
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
 # Import new emotion modules
 from analytics_logger import AnalyticsLogger
+from gemini_client import get_gemini
+from semantic_cache import SemanticCache
 from translations import SADEEM_KB_AR, UI_TRANSLATIONS_AR, get_translation
 
 # ============================================================================
@@ -22,12 +43,33 @@ from translations import SADEEM_KB_AR, UI_TRANSLATIONS_AR, get_translation
 # ============================================================================
 
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes responses with orjson, straight to bytes"""
+    
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+    
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode()
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.OPTIONS),
+            mimetype=self.mimetype
+        )
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonJSONProvider(app)
 CORS(app)
 
 # Global components
@@ -40,7 +82,7 @@ if GEMINI_API_KEY:
         genai.configure(api_key=GEMINI_API_KEY)
         logger.info("✓ Gemini API configured")
     except Exception as e:
-        logger.warning(f"Could not configure Gemini: {e}")
+        logger.warning("Could not configure Gemini: %s", e)
 
 # ============================================================================
 # SADEEM KNOWLEDGE BASE
@@ -105,6 +147,44 @@ SADEEM_KB = {
     }
 }
 
+# Keywords that mark a question as Sadeem-related
+SADEEM_KEYWORDS = [
+    'sadeem', 'fuel', 'card', 'fee', 'feature', 'benefitpay', 'benefit pay',
+    'restriction', 'format', 'prepaid', 'credit', 'apply', 'how much',
+    'cost', 'charge', 'what', 'how', 'use', 'get', 'student', 'young',
+    'vehicle', 'limit', 'bapco', 'good', 'best', 'work', 'available',
+    'app', 'mobile', 'download', 'iphone', 'android', 'apple',
+    'سديم', 'وقود', 'بترول', 'كرت', 'بطاقة', 'رسوم', 'ميزة', 'مميزات',
+    'بنفت', 'تطبيق', 'قيود', 'حدود', 'مسبق', 'ائتمان', 'تقديم', 'كم',
+    'سعر', 'تكلفة', 'وش', 'شنو', 'كيف', 'شلون', 'استخدام', 'طالب',
+    'سيارة', 'مركبة', 'بابكو', 'تزويد', 'زين', 'تحميل', 'تنزيل', 'ايفون',
+    'اندرويد', 'جوال', 'موبايل', 'تلفون', 'ابي', 'بغيت', 'عندي'
+]
+
+# Keywords that signal the user is ending the conversation
+CLOSING_KEYWORDS = [
+    'thanks', 'thank you', 'thx', 'bye', 'goodbye', 'see you', 'great', 'helpful', 'done',
+    'شكرا', 'شكراً', 'مشكور', 'باي', 'مع السلامة', 'يعطيك العافية', 'تمام', 'زين'
+]
+
+# Arabic diacritics (tashkeel) and tatweel, ignored when matching keywords
+ARABIC_DIACRITICS_RE = re.compile('[\u064B-\u0652\u0640]')
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase a query and strip Arabic diacritics for keyword matching"""
+    return ARABIC_DIACRITICS_RE.sub('', text.lower().strip())
+
+
+def _compile_keywords(keywords: List[str]) -> re.Pattern:
+    """Compile keywords into a single substring-matching alternation"""
+    normalized = dict.fromkeys(normalize_query(k) for k in keywords)
+    return re.compile('|'.join(map(re.escape, normalized)))
+
+
+SADEEM_KEYWORDS_RE = _compile_keywords(SADEEM_KEYWORDS)
+CLOSING_KEYWORDS_RE = _compile_keywords(CLOSING_KEYWORDS)
+
 # ============================================================================
 # EMOTION DETECTION (Replaced old SentimentAnalyzer)
 # ============================================================================
@@ -116,87 +196,177 @@ SADEEM_KB = {
 # VECTOR STORE
 # ============================================================================
 
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR', './embedding_cache')
+
+
+@functools.lru_cache(maxsize=1)
+def get_embedder() -> SentenceTransformer:
+    """Return the shared sentence embedding model, loading it on first use"""
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME, device=device)
+    model.eval()
+    logger.info("✓ Embedding model loaded on %s", device)
+    return model
+
+
+@functools.lru_cache(maxsize=256)
+def encode_query(text: str) -> np.ndarray:
+    """Embed one query (normalized), shared by retrieval and the semantic answer cache"""
+    embedding = get_embedder().encode([text], convert_to_numpy=True, normalize_embeddings=True)[0]
+    embedding.setflags(write=False)
+    return embedding
+
+
+def encode_documents(texts: List[str]) -> np.ndarray:
+    """
+    Encode documents, reusing embeddings cached on disk for the same content
+    
+    The cache file is keyed by a SHA-256 of the model name and texts, so any
+    change to the knowledge base produces a fresh encode. Embeddings are kept
+    as float16 (finer than the int8 search matrix built from them) and the
+    cache is memory-mapped rather than read into memory.
+    """
+    digest = hashlib.sha256('\0'.join([EMBEDDING_MODEL_NAME, *texts]).encode('utf-8')).hexdigest()
+    cache_path = os.path.join(EMBEDDING_CACHE_DIR, f"kb_{digest[:16]}.npy")
+    
+    if os.path.exists(cache_path):
+        try:
+            embeddings = np.load(cache_path, mmap_mode='r')
+            logger.info("✓ Loaded cached document embeddings from %s", cache_path)
+            return embeddings
+        except Exception as e:
+            logger.warning("Could not load cached embeddings: %s", e)
+    
+    embeddings = get_embedder().encode(
+        texts,
+        batch_size=64,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+        normalize_embeddings=True
+    ).astype(np.float16)
+    
+    try:
+        os.makedirs(EMBEDDING_CACHE_DIR, exist_ok=True)
+        np.save(cache_path, embeddings)
+    except Exception as e:
+        logger.warning("Could not cache document embeddings: %s", e)
+    
+    return embeddings
+
+
+def quantize_embeddings(embeddings: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize embeddings to int8 with one symmetric scale per row
+    
+    Returns:
+        (int8 matrix, float32 per-row scales) such that matrix * scales ≈ embeddings
+    """
+    embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    scales = np.abs(embeddings).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(embeddings / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
 class VectorStore:
+    """
+    In-memory vector index over the Sadeem knowledge base
+    
+    The knowledge base is a few dozen short documents, so embeddings are kept
+    in int8-quantized matrices, one per language, and searched with a single
+    matrix-vector product rather than through a vector database. When CUDA is
+    available, float embeddings are kept on the GPU and searched there instead.
+    """
+    
     def __init__(self):
+        self.documents: List[str] = []
+        self.metadatas: List[Dict] = []
+        self._partitions = {}
+        self._use_gpu = torch.cuda.is_available()
         try:
-            self.client = chromadb.PersistentClient(path="./chroma_db")
-            self.collection = self._init_collection()
+            self._add_documents()
+            get_embedder()  # Warm up the query encoder before the first request
             logger.info("✓ Vector store initialized")
-        except Exception as e:
-            logger.error(f"Error initializing vector store: {e}")
-            self.collection = None
+        except Exception:
+            logger.exception("Error initializing vector store")
+            self._partitions = {}
     
-    def _init_collection(self):
-        """Initialize ChromaDB collection"""
-        try:
-            try:
-                self.client.delete_collection(name="sadeem")
-            except:
-                pass
-            
-            collection = self.client.create_collection(name="sadeem")
-            self._add_documents(collection)
-            return collection
-        except Exception as e:
-            logger.error(f"Error initializing collection: {e}")
-            return None
+    def _add_documents(self):
+        """Embed the knowledge base documents and partition them by language"""
+        texts, metadatas = [], []
+        for category, data in SADEEM_KB.items():
+            for text in data['documents']:
+                texts.append(text)
+                metadatas.append({"category": category, "language": "en"})
+        
+        for category, data in SADEEM_KB_AR.items():
+            for text in data['documents']:
+                texts.append(text)
+                metadatas.append({"category": category, "language": "ar"})
+        
+        embeddings = encode_documents(texts)
+        self.documents = texts
+        self.metadatas = metadatas
+        
+        # One contiguous matrix per language so searches need no filtering;
+        # the None partition covers the whole corpus for unfiltered searches
+        languages = np.array([m['language'] for m in metadatas])
+        self._partitions = {None: self._make_partition(embeddings, texts)}
+        for language in ('en', 'ar'):
+            rows = np.flatnonzero(languages == language)
+            self._partitions[language] = self._make_partition(
+                embeddings[rows], [texts[i] for i in rows]
+            )
+        
+        logger.info(
+            f"✓ Added {len(self._partitions['en']['documents'])} English and "
+            f"{len(self._partitions['ar']['documents'])} Arabic documents to vector store"
+        )
     
-    def _add_documents(self, collection):
-        """Add documents to vector store"""
-        try:
-            model = SentenceTransformer('all-MiniLM-L6-v2')
-            
-            doc_id = 0
-            # Add English documents
-            for category, data in SADEEM_KB.items():
-                for text in data['documents']:
-                    embedding = model.encode(text).tolist()
-                    collection.add(
-                        embeddings=[embedding],
-                        documents=[text],
-                        ids=[f"doc_en_{doc_id}"],
-                        metadatas=[{"category": category, "language": "en"}]
-                    )
-                    doc_id += 1
-            
-            # Add Arabic documents
-            ar_doc_id = 0
-            for category, data in SADEEM_KB_AR.items():
-                for text in data['documents']:
-                    embedding = model.encode(text).tolist()
-                    collection.add(
-                        embeddings=[embedding],
-                        documents=[text],
-                        ids=[f"doc_ar_{ar_doc_id}"],
-                        metadatas=[{"category": category, "language": "ar"}]
-                    )
-                    ar_doc_id += 1
-            
-            logger.info(f"✓ Added {doc_id} English and {ar_doc_id} Arabic documents to vector store")
-        except Exception as e:
-            logger.error(f"Error adding documents: {e}")
+    def _make_partition(self, embeddings: np.ndarray, documents: List[str]) -> Dict:
+        """Build a search partition: int8 matrix and scales on CPU, or a float tensor on GPU"""
+        if self._use_gpu:
+            tensor = torch.from_numpy(np.ascontiguousarray(embeddings, dtype=np.float32)).to('cuda')
+            return {'tensor': tensor, 'documents': documents}
+        
+        matrix, scales = quantize_embeddings(embeddings)
+        return {'matrix': np.ascontiguousarray(matrix), 'scales': scales, 'documents': documents}
     
     def search(self, query: str, k: int = 3, language: str = "en") -> List[str]:
         """Search for relevant documents"""
-        if not self.collection:
+        # Pick the language's partition if provided
+        partition = self._partitions.get(language or None)
+        if partition is None:
+            return []
+        documents = partition['documents']
+        
+        k = min(k, len(documents))
+        if k <= 0:
             return []
         
         try:
-            # Filter by language if provided
-            where_filter = {"language": language} if language else None
+            if self._use_gpu:
+                # Fused similarity + top-k on the GPU
+                query_embedding = get_embedder().encode(
+                    [query], convert_to_tensor=True, normalize_embeddings=True
+                )
+                hits = util.semantic_search(query_embedding, partition['tensor'], top_k=k)[0]
+                return [documents[hit['corpus_id']] for hit in hits]
             
-            results = self.collection.query(
-                query_texts=[query], 
-                n_results=k,
-                where=where_filter
-            )
+            query_int8, query_scale = quantize_embeddings(encode_query(query))
             
-            if results and results['documents'] and results['documents'][0]:
-                # Return documents (Gemini will translate if needed)
-                return results['documents'][0]
-            return []
-        except Exception as e:
-            logger.error(f"Error searching: {e}")
+            # Cosine similarity from an int8 x int8 -> int32 product, rescaled
+            scores = np.matmul(partition['matrix'], query_int8[0], dtype=np.int32).astype(np.float32)
+            scores *= partition['scales'] * query_scale[0]
+            
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            
+            # Return documents (Gemini will translate if needed)
+            return [documents[i] for i in top]
+        except Exception:
+            logger.exception("Error searching")
             return []
 
 
@@ -204,19 +374,44 @@ class VectorStore:
 # RESPONSE GENERATOR WITH GEMINI (Combined with Emotion Detection)
 # ============================================================================
 
+# Extracts the EMOTION / CONFIDENCE / RESPONSE fields from the combined Gemini output;
+# the response may span multiple lines and contain those words itself
+GEMINI_RESPONSE_RE = re.compile(
+    r'(?:EMOTION:[ \t]*(?P<emotion>[^\n]*)\n)?\s*'
+    r'(?:CONFIDENCE:[ \t]*(?P<confidence>[^\n]*)\n)?\s*'
+    r'RESPONSE:[ \t]*(?P<response>.*)',
+    re.DOTALL
+)
+
+# Emotion labels Gemini may answer with in Arabic prompts
+ARABIC_EMOTION_MAP = {
+    'سعيد': 'Happy', 'محايد': 'Neutral', 'مرتبك': 'Confused',
+    'محبط': 'Frustrated', 'حزين': 'Sad'
+}
+
+# Runs vector searches so retrieval overlaps with the rest of request handling
+RETRIEVAL_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='retrieval')
+
+# Gemini answers are reused for later queries at least this similar (cosine)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.92))
+# Optional .npz file keeping the semantic answer cache across restarts
+SEMANTIC_CACHE_PATH = os.getenv('SEMANTIC_CACHE_PATH', '')
+
+
 class ResponseGenerator:
-    def __init__(self, vector_store):
+    def __init__(self, vector_store, semantic_cache: SemanticCache = None):
         self.vector_store = vector_store
+        self.semantic_cache = semantic_cache
         self.arabic_kb = SADEEM_KB_AR
         try:
-            self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+            self.gemini_model = get_gemini()
             self.has_gemini = GEMINI_API_KEY != ''
             if self.has_gemini:
                 logger.info("✓ Gemini API available for response generation")
             else:
                 logger.warning("⚠ Gemini API key not configured")
         except Exception as e:
-            logger.warning(f"Gemini not available: {e}")
+            logger.warning("Gemini not available: %s", e)
             self.gemini_model = None
             self.has_gemini = False
     
@@ -225,38 +420,126 @@ class ResponseGenerator:
         Generate response for query using Gemini, with integrated emotion detection.
         Returns: (response_text, emotion_label, emotion_confidence, request_rating)
         """
-        query_lower = query.lower().strip()
-        
-        # Select knowledge base based on language
-        kb = self.arabic_kb if language == "ar" else SADEEM_KB
-        
-        # Search for relevant documents (use appropriate KB)
-        documents = self.vector_store.search(query, k=3, language=language)
-        
-        # Check if query is related to Sadeem
-        is_sadeem_related = self._is_sadeem_question(query_lower)
-        
-        logger.info(f"Query: '{query}' | Sadeem-related: {is_sadeem_related} | Documents found: {len(documents)}")
-        
-        # Default values
-        emotion_label = "Neutral"
-        emotion_confidence = 0.0
-        should_request_rating = self._is_closing_intent(query_lower)
+        documents, is_sadeem_related, should_request_rating = self._prepare(query, language)
         
         # If Gemini is available, use it for combined detection and generation
         if self.has_gemini:
             logger.info("Using Gemini for combined emotion detection and response generation")
             
             try:
-                # Format documents
-                formatted_docs = []
-                for i, doc in enumerate(documents, 1):
-                    formatted_docs.append(f"- {doc}")
-                doc_text = "\n".join(formatted_docs)
+                cached = self._cached_result(query, language)
+                if cached is not None:
+                    emotion_label, emotion_confidence, response_text = cached
+                else:
+                    response = self.gemini_model.generate_content(self._build_prompt(query, documents, language))
+                    result_text = response.text.strip()
+                    
+                    emotion_label, emotion_confidence, response_text = self._parse_result(result_text)
+                    if not response_text:
+                        raise ValueError("Gemini returned an empty response")
+                    self._cache_result(query, language, emotion_label, emotion_confidence, response_text)
                 
-                # Construct combined prompt
-                if language == "ar":
-                    prompt = f"""أنت سديم، مساعد ذكي ومتحمس لكروت الوقود من البحرين.
+                # Add rating request if needed
+                if should_request_rating:
+                    response_text += self._rating_request(language)
+                
+                return response_text.strip(), emotion_label, emotion_confidence, should_request_rating
+
+            except Exception:
+                logger.exception("Error with Gemini combined call")
+                # Fallback to local logic below
+        
+        response_text = self._fallback_answer(documents, is_sadeem_related, should_request_rating, language)
+        return response_text, "Neutral", 0.0, should_request_rating
+    
+    def generate_stream(self, query: str, context: Dict = None, language: str = "en"):
+        """
+        Stream the response for query as it is generated by Gemini.
+        
+        Yields ('chunk', text) for each piece of the response, then a final
+        ('done', (response_text, emotion_label, emotion_confidence, request_rating)).
+        The EMOTION / CONFIDENCE header is held back until RESPONSE: arrives.
+        """
+        documents, is_sadeem_related, should_request_rating = self._prepare(query, language)
+        emotion_label, emotion_confidence = "Neutral", 0.0
+        streamed = []
+        
+        cached = self._cached_result(query, language) if self.has_gemini else None
+        if cached is not None:
+            emotion_label, emotion_confidence, text = cached
+            streamed.append(text)
+            yield 'chunk', text
+        elif self.has_gemini:
+            try:
+                stream = self.gemini_model.generate_content(
+                    self._build_prompt(query, documents, language),
+                    stream=True
+                )
+                
+                header = ""
+                for chunk in stream:
+                    text = chunk.text
+                    if not streamed:
+                        # Still buffering the header
+                        header += text
+                        if 'RESPONSE:' not in header:
+                            continue
+                        emotion_label, emotion_confidence, text = self._parse_result(header)
+                        text = text.lstrip()
+                        if not text:
+                            continue
+                    streamed.append(text)
+                    yield 'chunk', text
+                
+                if not streamed and header.strip() and 'RESPONSE:' not in header:
+                    # No RESPONSE: marker, send the raw output like generate() does
+                    emotion_label, emotion_confidence, text = self._parse_result(header.strip())
+                    streamed.append(text)
+                    yield 'chunk', text
+                
+                if streamed:
+                    self._cache_result(
+                        query, language, emotion_label, emotion_confidence, "".join(streamed).rstrip()
+                    )
+            except Exception:
+                logger.exception("Error with Gemini streaming call")
+        
+        if not streamed:
+            response_text = self._fallback_answer(documents, is_sadeem_related, should_request_rating, language)
+            yield 'chunk', response_text
+        else:
+            response_text = "".join(streamed).rstrip()
+            if should_request_rating:
+                suffix = self._rating_request(language)
+                response_text += suffix
+                yield 'chunk', suffix
+        
+        yield 'done', (response_text, emotion_label, emotion_confidence, should_request_rating)
+    
+    def _prepare(self, query: str, language: str) -> tuple[list, bool, bool]:
+        """Retrieve documents and classify the query; returns (documents, is_sadeem_related, request_rating)"""
+        # Search for relevant documents in the background (use appropriate KB)
+        documents_future = RETRIEVAL_EXECUTOR.submit(self.vector_store.search, query, 3, language)
+        
+        query_lower = normalize_query(query)
+        
+        # Check if query is related to Sadeem while retrieval runs
+        is_sadeem_related = self._is_sadeem_question(query_lower)
+        should_request_rating = self._is_closing_intent(query_lower)
+        
+        documents = documents_future.result()
+        
+        logger.info("Query: %r | Sadeem-related: %s | Documents found: %d", query, is_sadeem_related, len(documents))
+        return documents, is_sadeem_related, should_request_rating
+    
+    def _build_prompt(self, query: str, documents: list, language: str) -> str:
+        """Build the combined emotion detection and answer prompt"""
+        # Format documents
+        doc_text = "\n".join(f"- {doc}" for doc in documents)
+        
+        # Construct combined prompt
+        if language == "ar":
+            prompt = f"""أنت سديم، مساعد ذكي ومتحمس لكروت الوقود من البحرين.
                     
 سؤال العميل: "{query}"
 
@@ -279,8 +562,8 @@ CONFIDENCE: 0.9
 RESPONSE: مسامحة على الإزعاج يا خوي. عشان تحل هالمشكلة...
 
 الرد:"""
-                else:
-                    prompt = f"""You are Sadeem, a knowledgeable and enthusiastic Fuel Card assistant from Bahrain.
+        else:
+            prompt = f"""You are Sadeem, a knowledgeable and enthusiastic Fuel Card assistant from Bahrain.
 
 Customer Question: "{query}"
 
@@ -304,49 +587,58 @@ RESPONSE: I understand your frustration and I'm here to help. To resolve this...
 
 Response:"""
 
-                response = self.gemini_model.generate_content(prompt)
-                result_text = response.text.strip()
-                
-                # Parse the response
-                response_text = ""
-                for line in result_text.split('\n'):
-                    if line.startswith('EMOTION:'):
-                        emotion_label = line.split(':', 1)[1].strip()
-                        # Map Arabic emotions back to English labels if needed
-                        emotion_map = {
-                            'سعيد': 'Happy', 'محايد': 'Neutral', 'مرتبك': 'Confused', 
-                            'محبط': 'Frustrated', 'حزين': 'Sad'
-                        }
-                        emotion_label = emotion_map.get(emotion_label, emotion_label)
-                    elif line.startswith('CONFIDENCE:'):
-                        try:
-                            emotion_confidence = float(line.split(':', 1)[1].strip())
-                        except:
-                            emotion_confidence = 0.5
-                    elif line.startswith('RESPONSE:'):
-                        response_text = line.split(':', 1)[1].strip()
-                    elif response_text: # Append multi-line response
-                        response_text += "\n" + line
-                
-                if not response_text:
-                    # Fallback if parsing failed
-                    response_text = result_text
-                
-                # Add rating request if needed
-                if should_request_rating:
-                    if language == "ar":
-                        response_text += "\n\nلو عندك دقيقة، قيّم تجربتك معي! ⭐"
-                    else:
-                        response_text += "\n\nIf you have a moment, please rate your experience with me below! ⭐"
-                
-                return response_text.strip(), emotion_label, emotion_confidence, should_request_rating
-
-            except Exception as e:
-                logger.error(f"Error with Gemini combined call: {e}")
-                traceback.print_exc()
-                # Fallback to local logic below
+        return prompt
+    
+    def _parse_result(self, result_text: str) -> tuple[str, float, str]:
+        """Parse the combined Gemini output into (emotion_label, emotion_confidence, response_text)"""
+        emotion_label = "Neutral"
+        emotion_confidence = 0.0
+        # Without a RESPONSE: marker, treat the whole output as the answer
+        response_text = result_text
         
-        # Fallback logic (Gemini failed or not available)
+        match = GEMINI_RESPONSE_RE.search(result_text)
+        if match:
+            if match.group('emotion') is not None:
+                # Map Arabic emotions back to English labels if needed
+                emotion_label = match.group('emotion').strip()
+                emotion_label = ARABIC_EMOTION_MAP.get(emotion_label, emotion_label)
+            if match.group('confidence') is not None:
+                try:
+                    emotion_confidence = float(match.group('confidence').strip())
+                except ValueError:
+                    emotion_confidence = 0.5
+            # Everything after the marker, even if that is nothing yet
+            response_text = match.group('response').strip()
+        
+        return emotion_label, emotion_confidence, response_text
+    
+    def _cached_result(self, query: str, language: str):
+        """(emotion_label, emotion_confidence, response_text) cached for a similar query, or None"""
+        if self.semantic_cache is None:
+            return None
+        try:
+            return self.semantic_cache.get(language, query)
+        except Exception as e:
+            logger.warning("Semantic cache lookup failed: %s", e)
+            return None
+    
+    def _cache_result(self, query: str, language: str, emotion_label: str, emotion_confidence: float, response_text: str):
+        """Cache Gemini's result so a similarly worded query can skip the call"""
+        if self.semantic_cache is None:
+            return
+        try:
+            self.semantic_cache.put(language, query, (emotion_label, emotion_confidence, response_text))
+        except Exception as e:
+            logger.warning("Could not cache response: %s", e)
+    
+    def _rating_request(self, language: str) -> str:
+        """Text appended to the answer when the user is wrapping up"""
+        if language == "ar":
+            return "\n\nلو عندك دقيقة، قيّم تجربتك معي! ⭐"
+        return "\n\nIf you have a moment, please rate your experience with me below! ⭐"
+    
+    def _fallback_answer(self, documents: list, is_sadeem_related: bool, should_request_rating: bool, language: str) -> str:
+        """Fallback logic (Gemini failed or not available)"""
         logger.info("Using fallback response logic")
         
         if is_sadeem_related and documents:
@@ -360,34 +652,17 @@ Response:"""
              response_text = self._build_fallback_response([], language)
              
         if should_request_rating:
-            if language == "ar":
-                response_text += "\n\nلو عندك دقيقة، قيّم تجربتك معي! ⭐"
-            else:
-                response_text += "\n\nIf you have a moment, please rate your experience with me below! ⭐"
+            response_text += self._rating_request(language)
 
-        return response_text, emotion_label, emotion_confidence, should_request_rating
+        return response_text
     
     def _is_sadeem_question(self, query_lower: str) -> bool:
         """Check if question is about Sadeem"""
-        sadeem_keywords = [
-            'sadeem', 'fuel', 'card', 'fee', 'feature', 'benefitpay', 'benefit pay',
-            'restriction', 'format', 'prepaid', 'credit', 'apply', 'how much',
-            'cost', 'charge', 'what', 'how', 'use', 'get', 'student', 'young',
-            'vehicle', 'limit', 'bapco', 'good', 'best', 'work', 'available',
-            'app', 'mobile', 'download', 'iphone', 'android', 'apple',
-            'سديم', 'وقود', 'بترول', 'كرت', 'بطاقة', 'رسوم', 'ميزة', 'مميزات',
-            'بنفت', 'تطبيق', 'قيود', 'حدود', 'مسبق', 'ائتمان', 'تقديم', 'كم',
-            'سعر', 'تكلفة', 'وش', 'شنو', 'كيف', 'شلون', 'استخدام', 'طالب',
-            'سيارة', 'مركبة', 'بابكو', 'تزويد', 'زين', 'تحميل', 'تنزيل', 'ايفون',
-            'اندرويد', 'جوال', 'موبايل', 'تلفون', 'ابي', 'بغيت', 'عندي'
-        ]
-        return any(keyword in query_lower for keyword in sadeem_keywords)
+        return SADEEM_KEYWORDS_RE.search(query_lower) is not None
 
     def _is_closing_intent(self, query_lower: str) -> bool:
         """Check if user is ending the conversation"""
-        closing_keywords = ['thanks', 'thank you', 'thx', 'bye', 'goodbye', 'see you', 'great', 'helpful', 'done',
-                           'شكرا', 'شكراً', 'مشكور', 'باي', 'مع السلامة', 'يعطيك العافية', 'تمام', 'زين']
-        return any(keyword in query_lower for keyword in closing_keywords)
+        return CLOSING_KEYWORDS_RE.search(query_lower) is not None
     
     def _build_fallback_response(self, documents: list, language: str = "en") -> str:
         """Build fallback response from documents"""
@@ -426,35 +701,204 @@ Response:"""
 # SESSION MANAGEMENT
 # ============================================================================
 
+SESSION_TTL_SECONDS = int(os.getenv('SESSION_TTL_SECONDS', 24 * 3600))
+# When set (e.g. redis://localhost:6379/0), sessions are shared by all workers through Redis
+REDIS_URL = os.getenv('REDIS_URL', '')
+SESSION_SWEEP_INTERVAL_SECONDS = 60
+MAX_MESSAGES_PER_SESSION = 200
+
+
 class SessionManager:
-    def __init__(self):
-        self.sessions = {}
+    """
+    Session store laid out as parallel arrays indexed by session slot
+    
+    Creation and last-message times (unix ms) and ratings (0 = not rated)
+    live in contiguous NumPy arrays so expiry is a single vectorized
+    comparison, while ids and message lists stay in plain Python lists at
+    the same index.
+    """
+    
+    def __init__(self, ttl_seconds: int = SESSION_TTL_SECONDS, max_messages: int = MAX_MESSAGES_PER_SESSION):
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self._ids: List[str] = []
+        self._messages: List[List[Dict]] = []
+        self._index: Dict[str, int] = {}
+        self._created_ms = np.zeros(64, dtype=np.int64)
+        self._active_ms = np.zeros(64, dtype=np.int64)
+        self._ratings = np.zeros(64, dtype=np.int8)
+        self._last_sweep = time.monotonic()
+        # Requests are served concurrently (gunicorn gevent/threaded workers)
+        self._lock = threading.RLock()
+    
+    def _grow(self):
+        """Double the capacity of the per-session arrays"""
+        capacity = len(self._created_ms) * 2
+        self._created_ms = np.concatenate([self._created_ms, np.zeros(capacity - len(self._created_ms), dtype=np.int64)])
+        self._active_ms = np.concatenate([self._active_ms, np.zeros(capacity - len(self._active_ms), dtype=np.int64)])
+        self._ratings = np.concatenate([self._ratings, np.zeros(capacity - len(self._ratings), dtype=np.int8)])
     
     def create_session(self) -> str:
         """Create new session"""
         session_id = str(uuid.uuid4())
-        self.sessions[session_id] = {
-            'created_at': datetime.now(),
-            'messages': [],
-            'rating': None
-        }
-        logger.info(f"✓ Session created: {session_id}")
+        
+        with self._lock:
+            if time.monotonic() - self._last_sweep > SESSION_SWEEP_INTERVAL_SECONDS:
+                self.expire_older_than(self.ttl_seconds)
+            
+            slot = len(self._ids)
+            if slot == len(self._created_ms):
+                self._grow()
+            
+            self._created_ms[slot] = self._active_ms[slot] = time.time_ns() // 1_000_000
+            self._ratings[slot] = 0
+            self._ids.append(session_id)
+            self._messages.append([])
+            self._index[session_id] = slot
+        logger.info("✓ Session created: %s", session_id)
         return session_id
     
     def get_session(self, session_id: str) -> Dict:
         """Get session"""
-        return self.sessions.get(session_id)
+        with self._lock:
+            slot = self._index.get(session_id)
+            if slot is None:
+                return None
+            return {
+                'created_at': datetime.fromtimestamp(self._created_ms[slot] / 1000),
+                'messages': self._messages[slot],
+                'rating': int(self._ratings[slot]) or None
+            }
     
     def add_message(self, session_id: str, message: Dict):
-        """Add message to session"""
-        if session_id in self.sessions:
-            self.sessions[session_id]['messages'].append(message)
+        """Add message to session, keeping only the most recent max_messages"""
+        with self._lock:
+            slot = self._index.get(session_id)
+            if slot is not None:
+                self._active_ms[slot] = time.time_ns() // 1_000_000
+                messages = self._messages[slot]
+                messages.append(message)
+                if len(messages) > self.max_messages:
+                    del messages[:-self.max_messages]
             
     def add_rating(self, session_id: str, rating: int):
         """Add rating to session"""
-        if session_id in self.sessions:
-            self.sessions[session_id]['rating'] = rating
-            logger.info(f"Rating added for session {session_id}: {rating} stars")
+        with self._lock:
+            slot = self._index.get(session_id)
+            if slot is not None:
+                self._ratings[slot] = rating
+        if slot is not None:
+            logger.info("Rating added for session %s: %s stars", session_id, rating)
+    
+    def expire_older_than(self, ttl_seconds: int) -> int:
+        """
+        Drop sessions with no new message for more than ttl_seconds
+        
+        Returns:
+            Number of sessions removed
+        """
+        with self._lock:
+            self._last_sweep = time.monotonic()
+            count = len(self._ids)
+            now_ms = time.time_ns() // 1_000_000
+            keep = np.flatnonzero(now_ms - self._active_ms[:count] <= ttl_seconds * 1000)
+            if len(keep) == count:
+                return 0
+            
+            # Compact the surviving sessions to the front of every array
+            self._ids = [self._ids[i] for i in keep]
+            self._messages = [self._messages[i] for i in keep]
+            self._created_ms[:len(keep)] = self._created_ms[keep]
+            self._active_ms[:len(keep)] = self._active_ms[keep]
+            self._ratings[:len(keep)] = self._ratings[keep]
+            self._index = {session_id: slot for slot, session_id in enumerate(self._ids)}
+        
+        logger.info("Expired %d sessions", count - len(keep))
+        return count - len(keep)
+
+
+class RedisSessionManager:
+    """
+    Session store backed by Redis, shared across gunicorn workers
+    
+    Each session is a hash `sess:{id}` (created_ms, rating) plus a list
+    `sess:{id}:msgs` of JSON-encoded messages. Both keys expire together, a
+    session TTL after the last message, so Redis does the cleanup instead of a sweep.
+    """
+    
+    def __init__(self, client, ttl_seconds: int = SESSION_TTL_SECONDS, max_messages: int = MAX_MESSAGES_PER_SESSION):
+        self.redis = client
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+    
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"sess:{session_id}"
+    
+    def create_session(self) -> str:
+        """Create new session"""
+        session_id = str(uuid.uuid4())
+        key = self._key(session_id)
+        
+        pipe = self.redis.pipeline()
+        pipe.hset(key, mapping={'created_ms': time.time_ns() // 1_000_000, 'rating': 0})
+        pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+        
+        logger.info("✓ Session created: %s", session_id)
+        return session_id
+    
+    def get_session(self, session_id: str) -> Dict:
+        """Get session"""
+        key = self._key(session_id)
+        
+        pipe = self.redis.pipeline()
+        pipe.hgetall(key)
+        pipe.lrange(f"{key}:msgs", 0, -1)
+        fields, messages = pipe.execute()
+        if not fields:
+            return None
+        
+        return {
+            'created_at': datetime.fromtimestamp(int(fields[b'created_ms']) / 1000),
+            'messages': [json.loads(m) for m in messages],
+            'rating': int(fields[b'rating']) or None
+        }
+    
+    def add_message(self, session_id: str, message: Dict):
+        """Add message to session, keeping only the most recent max_messages"""
+        key = self._key(session_id)
+        if not self.redis.exists(key):
+            return
+        
+        pipe = self.redis.pipeline()
+        pipe.rpush(f"{key}:msgs", json.dumps(message, ensure_ascii=False))
+        pipe.ltrim(f"{key}:msgs", -self.max_messages, -1)
+        # Keep the session hash alive as long as its messages
+        pipe.expire(key, self.ttl_seconds)
+        pipe.expire(f"{key}:msgs", self.ttl_seconds)
+        pipe.execute()
+    
+    def add_rating(self, session_id: str, rating: int):
+        """Add rating to session"""
+        key = self._key(session_id)
+        if self.redis.exists(key):
+            self.redis.hset(key, 'rating', rating)
+            logger.info("Rating added for session %s: %s stars", session_id, rating)
+    
+    def expire_older_than(self, ttl_seconds: int) -> int:
+        """Sessions expire in Redis on their own; nothing to sweep"""
+        return 0
+
+
+def create_redis_client(url: str = REDIS_URL):
+    """Create a pooled Redis client, or None if Redis is not configured"""
+    if not url:
+        return None
+    if redis is None:
+        logger.warning("REDIS_URL is set but the redis package is not installed, using in-process sessions")
+        return None
+    return redis.Redis(connection_pool=redis.BlockingConnectionPool.from_url(url, max_connections=50))
 
 
 # ============================================================================
@@ -471,26 +915,40 @@ def initialize_components():
         # Initialize vector store
         chatbot_components['vector_store'] = VectorStore()
         
-        # Initialize response generator (now handles emotion detection too)
+        # Initialize response generator (now handles emotion detection too),
+        # reusing Gemini answers for similarly worded queries
+        semantic_cache = SemanticCache(
+            embed_fn=encode_query,
+            threshold=SEMANTIC_CACHE_THRESHOLD,
+            path=SEMANTIC_CACHE_PATH or None
+        )
+        if semantic_cache.path:
+            atexit.register(semantic_cache.save)
         chatbot_components['response_generator'] = ResponseGenerator(
-            chatbot_components['vector_store']
+            chatbot_components['vector_store'],
+            semantic_cache
         )
         
-        # Initialize session manager
-        chatbot_components['session_manager'] = SessionManager()
+        # Initialize session manager (shared through Redis when REDIS_URL is set)
+        redis_client = create_redis_client()
+        if redis_client is not None:
+            chatbot_components['session_manager'] = RedisSessionManager(redis_client)
+            logger.info("✓ Sessions stored in Redis")
+        else:
+            chatbot_components['session_manager'] = SessionManager()
         
         # Initialize analytics logger
         chatbot_components['analytics_logger'] = AnalyticsLogger(
             log_file='analytics.jsonl',
             hash_messages=False,  # Set to True for privacy
-            enabled=True
+            enabled=True,
+            binary_log_file=os.getenv('ANALYTICS_BINARY_LOG') or None  # e.g. analytics.mpk
         )
         
         logger.info("✅ All components initialized!")
         return True
-    except Exception as e:
-        logger.error(f"❌ Initialization error: {e}")
-        traceback.print_exc()
+    except Exception:
+        logger.exception("❌ Initialization error")
         return False
 
 
@@ -498,9 +956,19 @@ def initialize_components():
 # API ROUTES
 # ============================================================================
 
+def _msg_id() -> str:
+    """Random 64-bit message id as 16 hex characters"""
+    return secrets.token_hex(8)
+
+
+def _now_iso() -> str:
+    """Current UTC time in ISO 8601 format with milliseconds"""
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
+    return jsonify({'status': 'healthy', 'timestamp': _now_iso()})
 
 
 @app.route('/api/info', methods=['GET'])
@@ -521,18 +989,86 @@ def start_session():
             'success': True,
             'session_id': session_id,
             'initial_message': {
-                'id': str(uuid.uuid4()),
+                'id': _msg_id(),
                 'text': "Hello! I'm Sadeem, your Fuel Card assistant. How can I help you today?",
                 'sender': 'bot',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _now_iso(),
                 'emotion': 'neutral'
             }
         }), 201
     except Exception as e:
-        logger.error(f"Error: {e}")
+        logger.exception("Error starting session")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _record_exchange(
+    session_id: str,
+    message: str,
+    language: str,
+    response_text: str,
+    emotion_label: str,
+    emotion_confidence: float,
+    request_rating: bool,
+    start_time: float
+) -> tuple[Dict, Dict, float]:
+    """
+    Store a user message and the bot's reply in the session and log analytics
+    Returns: (user_message, bot_message, response_time)
+    """
+    sm = chatbot_components['session_manager']
+    analytics = chatbot_components.get('analytics_logger')
+    timestamp = _now_iso()
+    
+    # User message (we log the detected emotion here for consistency with old format)
+    user_message = {
+        'id': _msg_id(),
+        'text': message,
+        'sender': 'user',
+        'timestamp': timestamp,
+        'emotion': emotion_label,
+        'emotion_confidence': emotion_confidence
+    }
+    sm.add_message(session_id, user_message)
+    
+    logger.info("User: %r | Language: %s | Emotion: %s (%.2f)", message, language, emotion_label, emotion_confidence)
+    
+    bot_message = {
+        'id': _msg_id(),
+        'text': response_text,
+        'sender': 'bot',
+        'timestamp': timestamp,
+        'emotion': 'neutral',  # Bot is always neutral
+        'request_rating': request_rating
+    }
+    sm.add_message(session_id, bot_message)
+    
+    # Calculate response time
+    response_time = time.time() - start_time
+    
+    # Log analytics
+    if analytics:
+        analytics.log_message(
+            session_id=session_id,
+            user_message=message,
+            emotion_data={'label': emotion_label, 'confidence': emotion_confidence},
+            response_time=response_time,
+            bot_response=response_text,
+            metadata={
+                'message_id': user_message['id'],
+                'response_id': bot_message['id'],
+                'request_rating': request_rating
+            }
+        )
+    
+    return user_message, bot_message, response_time
+
+
+def _json_body() -> Dict:
+    """The request's JSON object, or {} if the body is missing, not JSON or not an object"""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
+
+
 @app.route('/api/chat/message', methods=['POST', 'OPTIONS'])
 def chat_message():
     if request.method == 'OPTIONS':
@@ -541,9 +1077,10 @@ def chat_message():
     start_time = time.time()
     
     try:
-        data = request.get_json()
+        data = _json_body()
         session_id = data.get('session_id')
-        message = data.get('message', '').strip()
+        message = data.get('message')
+        message = message.strip() if isinstance(message, str) else ''
         language = data.get('language', 'en')  # Default to English
         
         if not session_id or not message:
@@ -551,7 +1088,6 @@ def chat_message():
         
         sm = chatbot_components['session_manager']
         rg = chatbot_components['response_generator']
-        analytics = chatbot_components.get('analytics_logger')
         
         # Generate response AND detect emotion in one go
         context = {
@@ -561,85 +1097,92 @@ def chat_message():
         
         response_text, emotion_label, emotion_confidence, request_rating = rg.generate(message, context, language)
         
-        # User message (we log the detected emotion here for consistency with old format)
-        user_message = {
-            'id': str(uuid.uuid4()),
-            'text': message,
-            'sender': 'user',
-            'timestamp': datetime.now().isoformat(),
-            'emotion': emotion_label,
-            'emotion_confidence': emotion_confidence,
-            'emotion_scores': {emotion_label: emotion_confidence} # Simplified scores
-        }
-        sm.add_message(session_id, user_message)
-        
-        logger.info(f"User: '{message}' | Language: {language} | Emotion: {emotion_label} ({emotion_confidence:.2f})")
-        
-        bot_message = {
-            'id': str(uuid.uuid4()),
-            'text': response_text,
-            'sender': 'bot',
-            'timestamp': datetime.now().isoformat(),
-            'emotion': 'neutral',  # Bot is always neutral
-            'request_rating': request_rating
-        }
-        sm.add_message(session_id, bot_message)
-        
-        # Calculate response time
-        response_time = time.time() - start_time
-        
-        # Log analytics
-        if analytics:
-            analytics.log_message(
-                session_id=session_id,
-                user_message=message,
-                emotion_data={'label': emotion_label, 'confidence': emotion_confidence},
-                response_time=response_time,
-                bot_response=response_text,
-                metadata={
-                    'message_id': user_message['id'],
-                    'response_id': bot_message['id'],
-                    'request_rating': request_rating
-                }
-            )
+        user_message, bot_message, response_time = _record_exchange(
+            session_id, message, language, response_text,
+            emotion_label, emotion_confidence, request_rating, start_time
+        )
         
-        logger.info(f"Bot: '{response_text[:80]}...' | Response time: {response_time:.2f}s")
+        logger.info("Bot: %r... | Response time: %.2fs", response_text[:80], response_time)
         
+        # The stored messages already have exactly the fields the client expects
         return jsonify({
             'success': True,
             'session_id': session_id,
-            'user_message': {
-                'id': user_message['id'],
-                'text': user_message['text'],
-                'sender': user_message['sender'],
-                'timestamp': user_message['timestamp'],
-                'emotion': user_message['emotion'],
-                'emotion_confidence': user_message['emotion_confidence'],
-                'emotion_scores': user_message['emotion_scores']
-            },
-            'bot_message': {
-                'id': bot_message['id'],
-                'text': bot_message['text'],
-                'sender': bot_message['sender'],
-                'timestamp': bot_message['timestamp'],
-                'emotion': bot_message['emotion'],
-                'request_rating': bot_message['request_rating']
-            },
+            'user_message': user_message,
+            'bot_message': bot_message,
             'response_time_ms': round(response_time * 1000, 2)
         }), 200
     
     except Exception as e:
-        logger.error(f"Error: {e}")
-        traceback.print_exc()
+        logger.exception("chat_message failed")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _sse(payload: Dict) -> str:
+    """Format a payload as one Server-Sent Events frame"""
+    return f"data: {app.json.dumps(payload)}\n\n"
+
+
+@app.route('/api/chat/message/stream', methods=['POST'])
+def chat_message_stream():
+    """Same as /api/chat/message, but streams the answer as Server-Sent Events"""
+    start_time = time.time()
+    
+    data = _json_body()
+    session_id = data.get('session_id')
+    message = data.get('message')
+    message = message.strip() if isinstance(message, str) else ''
+    language = data.get('language', 'en')  # Default to English
+    
+    if not session_id or not message:
+        return jsonify({'success': False, 'error': 'Missing data'}), 400
+    
+    sm = chatbot_components['session_manager']
+    rg = chatbot_components['response_generator']
+    context = {
+        'session_id': session_id,
+        'session': sm.get_session(session_id)
+    }
+    
+    def events():
+        try:
+            for kind, payload in rg.generate_stream(message, context, language):
+                if kind == 'chunk':
+                    yield _sse({'chunk': payload})
+                    continue
+                
+                response_text, emotion_label, emotion_confidence, request_rating = payload
+                user_message, bot_message, response_time = _record_exchange(
+                    session_id, message, language, response_text,
+                    emotion_label, emotion_confidence, request_rating, start_time
+                )
+                logger.info("Bot (streamed): %r... | Response time: %.2fs", response_text[:80], response_time)
+                
+                yield _sse({
+                    'done': True,
+                    'success': True,
+                    'session_id': session_id,
+                    'user_message': user_message,
+                    'bot_message': bot_message,
+                    'response_time_ms': round(response_time * 1000, 2)
+                })
+        except Exception as e:
+            logger.exception("chat_message_stream failed")
+            yield _sse({'done': True, 'success': False, 'error': str(e)})
+    
+    # X-Accel-Buffering stops nginx from holding back the stream
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/session/<session_id>/rating', methods=['POST'])
 def submit_rating(session_id):
     """Submit a rating for the session"""
     try:
-        data = request.get_json()
-        rating = data.get('rating')
+        rating = _json_body().get('rating')
         
         if not rating or not isinstance(rating, int) or rating < 1 or rating > 5:
             return jsonify({'success': False, 'error': 'Invalid rating'}), 400
@@ -652,11 +1195,11 @@ def submit_rating(session_id):
         if analytics:
             # We log it as a special system message or just update metadata?
             # For simplicity, let's just log it
-            logger.info(f"Rating submitted for session {session_id}: {rating} stars")
+            logger.info("Rating submitted for session %s: %s stars", session_id, rating)
             
         return jsonify({'success': True}), 200
     except Exception as e:
-        logger.error(f"Error submitting rating: {e}")
+        logger.exception("Error submitting rating")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -666,9 +1209,9 @@ def get_history(session_id):
         session = chatbot_components['session_manager'].get_session(session_id)
         if not session:
             return jsonify({'success': False, 'error': 'Not found'}), 404
-        return jsonify({'session_id': session_id, 'messages': session['messages']}), 200
+        return jsonify({'session_id': session_id, 'messages': session['messages']})
     except Exception as e:
-        logger.error(f"Error: {e}")
+        logger.exception("Error retrieving history")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -689,9 +1232,9 @@ def get_emotion_analytics():
         return jsonify({
             'success': True,
             'statistics': stats
-        }), 200
+        })
     except Exception as e:
-        logger.error(f"Error retrieving analytics: {e}")
+        logger.exception("Error retrieving analytics")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -712,9 +1255,9 @@ def get_recent_analytics():
             'success': True,
             'count': len(logs),
             'logs': logs
-        }), 200
+        })
     except Exception as e:
-        logger.error(f"Error retrieving recent logs: {e}")
+        logger.exception("Error retrieving recent logs")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -730,11 +1273,12 @@ if __name__ == '__main__':
         logger.info("=" * 70)
         logger.info("✅ SADEEM CHATBOT WITH 5-EMOTION AI - READY!")
         logger.info("=" * 70)
-        logger.info(f"API: http://localhost:5000")
-        logger.info(f"Frontend: http://localhost:3000")
-        logger.info(f"Emotions: Happy, Neutral, Confused, Frustrated, Sad")
+        logger.info("API: http://localhost:5000")
+        logger.info("Frontend: http://localhost:3000")
+        logger.info("Emotions: Happy, Neutral, Confused, Frustrated, Sad")
         logger.info("=" * 70)
         
+        # Development server only; production runs under gunicorn (see gunicorn.conf.py)
         app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=True)
     else:
         logger.error("Failed to initialize!")
\ No newline at end of file
@@ -9,13 +9,94 @@ Detects user emotions from text messages:
 - Sad / Upset
 """
 
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
 import logging
-from typing import Dict, Optional
-from transformers import pipeline
-import google.generativeai as genai
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+from transformers import AutoConfig, AutoTokenizer, pipeline
+
+from gemini_client import get_gemini
+from translations import Emotion
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
 
 logger = logging.getLogger(__name__)
 
+EMOTION_MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
+
+# Directory holding the exported INT8 ONNX model, its tokenizer and config
+EMOTION_ONNX_DIR = os.getenv('EMOTION_ONNX_DIR', './emotion_onnx')
+EMOTION_ONNX_FILE = 'model_int8.onnx'
+
+# Classes returned per message by the transformers pipeline; the rest are
+# near zero and do not change the dominant emotion
+PIPELINE_TOP_K = 3
+
+
+@lru_cache(maxsize=None)
+def load_onnx_emotion_model(num_threads: int = 1):
+    """
+    Load the INT8 ONNX emotion model once per process
+    
+    The model is not exported here: concurrent workers would race on the
+    export. Run python -m scripts.export_emotion_onnx before starting the server.
+    
+    Args:
+        num_threads: Intra/inter-op threads for the inference session
+        
+    Returns:
+        (InferenceSession, tokenizer, id2label) shared by every EmotionDetector
+    """
+    model_path = os.path.join(EMOTION_ONNX_DIR, EMOTION_ONNX_FILE)
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"{model_path} not found, run python -m scripts.export_emotion_onnx")
+    
+    logger.info("Loading INT8 ONNX emotion detection model...")
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = num_threads
+    options.inter_op_num_threads = num_threads
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+    tokenizer = AutoTokenizer.from_pretrained(EMOTION_ONNX_DIR)
+    id2label = AutoConfig.from_pretrained(EMOTION_ONNX_DIR).id2label
+    return session, tokenizer, id2label
+
+
+@lru_cache(maxsize=None)
+def load_emotion_pipeline():
+    """Load the transformers emotion pipeline (model and tokenizer) once per process"""
+    logger.info("Loading emotion detection model...")
+    emotion_pipeline = pipeline("text-classification", model=EMOTION_MODEL_NAME, top_k=PIPELINE_TOP_K)
+    
+    # Runs on CPU: INT8 dynamic quantization of the Linear layers, like the ONNX model
+    emotion_pipeline.model = torch.quantization.quantize_dynamic(
+        emotion_pipeline.model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return emotion_pipeline
+
+
+def _build_projection(source_labels: list, mapping: Dict, target_labels: list) -> np.ndarray:
+    """Build a (source, target) 0/1 matrix that sums source scores into target emotions"""
+    projection = np.zeros((len(source_labels), len(target_labels)), dtype=np.float32)
+    for i, label in enumerate(source_labels):
+        projection[i, target_labels.index(mapping.get(label, 'Neutral'))] = 1.0
+    return projection
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    """Numerically stable softmax over the last axis"""
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
 
 class EmotionDetector:
     """
@@ -34,41 +115,100 @@ class EmotionDetector:
         'disgust': 'Frustrated',  # Map disgust to frustrated
     }
     
-    TARGET_EMOTIONS = ['Happy', 'Neutral', 'Confused', 'Frustrated', 'Sad']
+    TARGET_EMOTIONS = [e.name for e in Emotion]
+    
+    # Label order of the 7-class model, and the matrix projecting it onto TARGET_EMOTIONS
+    HF_LABELS = ['anger', 'disgust', 'fear', 'joy', 'neutral', 'sadness', 'surprise']
+    _HF_INDEX = {label: i for i, label in enumerate(HF_LABELS)}
+    _P = _build_projection(HF_LABELS, EMOTION_MAPPING, TARGET_EMOTIONS)
     
-    def __init__(self, use_gemini_fallback: bool = True, confidence_threshold: float = 0.3):
+    def __init__(
+        self,
+        use_gemini_fallback: bool = True,
+        confidence_threshold: float = 0.3,
+        cache_size: int = 4096,
+        gemini_model=None,
+        num_threads: int = 1
+    ):
         """
         Initialize emotion detector
         
         Args:
             use_gemini_fallback: Whether to use Gemini API for low-confidence cases
             confidence_threshold: Minimum confidence to accept model prediction
+            cache_size: Number of recent results kept by message text (0 disables caching)
+            gemini_model: Gemini model to use for the fallback (defaults to the shared instance)
+            num_threads: Threads for the ONNX Runtime session (torch's are set per process)
         """
         self.confidence_threshold = confidence_threshold
         self.use_gemini_fallback = use_gemini_fallback
+        self.cache_size = cache_size
+        self.num_threads = num_threads
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         self.emotion_pipeline = None
-        self.gemini_model = None
+        self.onnx_session = None
+        self.tokenizer = None
+        self.id2label = None
+        self._gemini_model = gemini_model
+        
+        # Prefer the INT8 ONNX Runtime model, fall back to the PyTorch pipeline
+        if ort is not None:
+            try:
+                self._load_onnx_model()
+            except Exception as e:
+                logger.warning(f"ONNX emotion model not available ({e}), using PyTorch pipeline")
         
         # Initialize Hugging Face emotion model
-        try:
-            logger.info("Loading emotion detection model...")
-            self.emotion_pipeline = pipeline(
-                "text-classification",
-                model="j-hartmann/emotion-english-distilroberta-base",
-                top_k=None  # Return all emotion scores
-            )
-            logger.info("✓ Emotion detection model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load emotion model: {e}")
-            logger.warning("⚠ Emotion detection will use Gemini API only")
+        if self.onnx_session is None:
+            try:
+                self.emotion_pipeline = load_emotion_pipeline()
+                logger.info("✓ Emotion detection model loaded successfully")
+            except Exception as e:
+                logger.error(f"Failed to load emotion model: {e}")
+                logger.warning("⚠ Emotion detection will use Gemini API only")
         
-        # Initialize Gemini fallback if enabled
+        # Gemini fallback is created on first use (see gemini_model)
         if use_gemini_fallback:
+            logger.info("✓ Gemini fallback enabled for emotion detection")
+    
+    @property
+    def gemini_model(self):
+        """Gemini model for the fallback, resolved to the shared instance on first use"""
+        if self._gemini_model is None and self.use_gemini_fallback:
             try:
-                self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
-                logger.info("✓ Gemini fallback enabled for emotion detection")
+                self._gemini_model = get_gemini()
             except Exception as e:
                 logger.warning(f"Gemini fallback not available: {e}")
+                self.use_gemini_fallback = False
+        return self._gemini_model
+    
+    @gemini_model.setter
+    def gemini_model(self, model):
+        self._gemini_model = model
+    
+    def _load_onnx_model(self):
+        """Attach the shared INT8 ONNX model to this detector"""
+        self.onnx_session, self.tokenizer, self.id2label = load_onnx_emotion_model(self.num_threads)
+        self._onnx_inputs = {i.name for i in self.onnx_session.get_inputs()}
+        # Reorder the model's outputs into HF_LABELS order
+        self._onnx_order = np.argsort([self._HF_INDEX[self.id2label[i]] for i in range(len(self.id2label))])
+        logger.info("✓ ONNX emotion detection model loaded successfully")
+    
+    def _predict_onnx(self, texts: List[str]) -> np.ndarray:
+        """Run the ONNX model on a batch and return (batch, 7) probabilities in HF_LABELS order"""
+        encoded = self.tokenizer(texts, padding=True, truncation=True, return_tensors='np')
+        feed = {k: v for k, v in encoded.items() if k in self._onnx_inputs}
+        logits = self.onnx_session.run(None, feed)[0]
+        return _softmax(logits[:, self._onnx_order])
+    
+    def _predict_pipeline(self, texts: List[str]) -> np.ndarray:
+        """Run the transformers pipeline on a batch and return (batch, 7) probabilities in HF_LABELS order"""
+        probs = np.zeros((len(texts), len(self.HF_LABELS)))
+        for row, predictions in enumerate(self.emotion_pipeline(texts)):
+            for pred in predictions:
+                probs[row, self._HF_INDEX[pred['label']]] = pred['score']
+        return probs
     
     def detect_emotion(self, user_message: str) -> Dict:
         """
@@ -86,8 +226,53 @@ class EmotionDetector:
         if not user_message or not user_message.strip():
             return self._default_emotion()
         
+        # Emotion only depends on the text, so repeated messages are served from cache
+        cache_key = self._cache_key(user_message)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = self._detect_uncached(user_message)
+        if result is not None:
+            self._cache_put(cache_key, result)
+            return self._copy_result(result)
+        
+        # Ultimate fallback: return neutral
+        return self._default_emotion()
+    
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Cache key for a message: digest of its normalized text"""
+        return hashlib.blake2s(text.strip().lower().encode('utf-8'), digest_size=8).digest()
+    
+    @staticmethod
+    def _copy_result(result: Dict) -> Dict:
+        """Copy a result so callers cannot modify the cached one"""
+        return dict(result, scores=dict(result['scores']))
+    
+    def _cache_get(self, key: bytes) -> Optional[Dict]:
+        """Return a copy of the cached result for key, marking it most recently used"""
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is None:
+                return None
+            self._cache.move_to_end(key)
+        return self._copy_result(result)
+    
+    def _cache_put(self, key: bytes, result: Dict):
+        """Store a result, evicting the least recently used entry when full"""
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _detect_uncached(self, user_message: str) -> Optional[Dict]:
+        """Run the model (and Gemini fallback); None if every detector failed"""
         # Try Hugging Face model first
-        if self.emotion_pipeline:
+        if self.onnx_session or self.emotion_pipeline:
             try:
                 result = self._detect_with_hf_model(user_message)
                 
@@ -109,40 +294,44 @@ class EmotionDetector:
             except Exception as e:
                 logger.error(f"Error in Gemini emotion detection: {e}")
         
-        # Ultimate fallback: return neutral
-        return self._default_emotion()
+        return None
     
     def _detect_with_hf_model(self, text: str) -> Dict:
         """Detect emotion using Hugging Face model"""
+        return self._detect_batch_with_hf_model([text])[0]
+    
+    def _detect_batch_with_hf_model(self, texts: List[str]) -> List[Dict]:
+        """Detect emotions for several messages with one model call"""
         # Get predictions from model
-        predictions = self.emotion_pipeline(text)[0]
-        
-        # Convert to our 5-emotion format
-        emotion_scores = {emotion: 0.0 for emotion in self.TARGET_EMOTIONS}
-        
-        for pred in predictions:
-            original_label = pred['label']
-            score = pred['score']
-            
-            # Map to our target emotion
-            target_emotion = self.EMOTION_MAPPING.get(original_label, 'Neutral')
-            emotion_scores[target_emotion] += score
-        
-        # Normalize scores to sum to 1.0
-        total = sum(emotion_scores.values())
-        if total > 0:
-            emotion_scores = {k: v/total for k, v in emotion_scores.items()}
+        if self.onnx_session:
+            probs = self._predict_onnx(texts)
+        else:
+            probs = self._predict_pipeline(texts)
         
-        # Get dominant emotion
-        dominant_emotion = max(emotion_scores.items(), key=lambda x: x[1])
+        # Convert to our 5-emotion format. Probabilities come from a softmax over
+        # all 7 classes, so no renormalization is needed (and with only the top
+        # classes returned, scores stay true probabilities instead of inflating)
+        scores = probs @ self._P
         
-        logger.info(f"Emotion detected: {dominant_emotion[0]} ({dominant_emotion[1]:.2f}) for '{text[:50]}...'")
+        # Dominant emotion and its confidence for the whole batch at once,
+        # then a single conversion of the scores back to Python floats
+        dominant = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(texts)), dominant].tolist()
+        rows = scores.tolist()
         
-        return {
-            'label': dominant_emotion[0],
-            'confidence': dominant_emotion[1],
-            'scores': emotion_scores
-        }
+        results = []
+        for text, idx, confidence, row in zip(texts, dominant.tolist(), confidences, rows):
+            label = self.TARGET_EMOTIONS[idx]
+            
+            logger.info(f"Emotion detected: {label} ({confidence:.2f}) for '{text[:50]}...'")
+            
+            results.append({
+                'label': label,
+                'emotion': Emotion(idx),
+                'confidence': confidence,
+                'scores': dict(zip(self.TARGET_EMOTIONS, row))
+            })
+        return results
     
     def _detect_with_gemini(self, text: str) -> Optional[Dict]:
         """Detect emotion using Gemini API"""
@@ -150,7 +339,16 @@ class EmotionDetector:
             return None
         
         try:
-            prompt = f"""Analyze the emotion in this message and classify it into exactly ONE of these 5 categories:
+            response = self.gemini_model.generate_content(self._gemini_prompt(text))
+            return self._parse_gemini_result(response.text.strip())
+        
+        except Exception as e:
+            logger.error(f"Gemini emotion detection failed: {e}")
+            return None
+    
+    def _gemini_prompt(self, text: str) -> str:
+        """Build the Gemini emotion classification prompt"""
+        return f"""Analyze the emotion in this message and classify it into exactly ONE of these 5 categories:
 - Happy (positive, joyful, satisfied, grateful)
 - Neutral (calm, informational, matter-of-fact)
 - Confused (uncertain, puzzled, seeking clarification)
@@ -166,48 +364,45 @@ CONFIDENCE: [score]
 Example:
 EMOTION: Frustrated
 CONFIDENCE: 0.85"""
-
-            response = self.gemini_model.generate_content(prompt)
-            result_text = response.text.strip()
-            
-            # Parse response
+    
+    def _parse_gemini_result(self, result_text: str) -> Dict:
+        """Parse Gemini's EMOTION / CONFIDENCE answer into a detection result"""
+        # Parse response
+        emotion_label = 'Neutral'
+        confidence = 0.5
+        
+        for line in result_text.split('\n'):
+            if line.startswith('EMOTION:'):
+                emotion_label = line.split(':', 1)[1].strip()
+            elif line.startswith('CONFIDENCE:'):
+                try:
+                    confidence = float(line.split(':', 1)[1].strip())
+                except:
+                    confidence = 0.5
+        
+        # Validate emotion label
+        if emotion_label not in self.TARGET_EMOTIONS:
+            logger.warning(f"Invalid emotion from Gemini: {emotion_label}, defaulting to Neutral")
             emotion_label = 'Neutral'
-            confidence = 0.5
-            
-            for line in result_text.split('\n'):
-                if line.startswith('EMOTION:'):
-                    emotion_label = line.split(':', 1)[1].strip()
-                elif line.startswith('CONFIDENCE:'):
-                    try:
-                        confidence = float(line.split(':', 1)[1].strip())
-                    except:
-                        confidence = 0.5
-            
-            # Validate emotion label
-            if emotion_label not in self.TARGET_EMOTIONS:
-                logger.warning(f"Invalid emotion from Gemini: {emotion_label}, defaulting to Neutral")
-                emotion_label = 'Neutral'
-            
-            # Create score distribution (dominant emotion gets confidence, rest split remaining)
-            scores = {e: (1 - confidence) / 4 for e in self.TARGET_EMOTIONS}
-            scores[emotion_label] = confidence
-            
-            logger.info(f"Gemini emotion: {emotion_label} ({confidence:.2f})")
-            
-            return {
-                'label': emotion_label,
-                'confidence': confidence,
-                'scores': scores
-            }
         
-        except Exception as e:
-            logger.error(f"Gemini emotion detection failed: {e}")
-            return None
+        # Create score distribution (dominant emotion gets confidence, rest split remaining)
+        scores = {e: (1 - confidence) / 4 for e in self.TARGET_EMOTIONS}
+        scores[emotion_label] = confidence
+        
+        logger.info(f"Gemini emotion: {emotion_label} ({confidence:.2f})")
+        
+        return {
+            'label': emotion_label,
+            'emotion': Emotion[emotion_label],
+            'confidence': confidence,
+            'scores': scores
+        }
     
     def _default_emotion(self) -> Dict:
         """Return default neutral emotion"""
         return {
             'label': 'Neutral',
+            'emotion': Emotion.Neutral,
             'confidence': 1.0,
             'scores': {
                 'Happy': 0.0,
@@ -5,12 +5,91 @@ Adapts bot responses based on detected user emotion to provide
 more empathetic and contextually appropriate interactions.
 """
 
+from collections import OrderedDict
 import logging
+import threading
 from typing import Dict, List, Optional
 import google.generativeai as genai
 
+from translations import Emotion
+
 logger = logging.getLogger(__name__)
 
+# Below this confidence a Happy message gets a prefix instead of a Gemini rewrite
+HAPPY_REWRITE_MIN_CONFIDENCE = 0.6
+
+# Emotion-specific system prompts
+EMOTION_PROMPTS = {
+    'Happy': """You are Sadeem, a friendly Fuel Card assistant. The user is in a HAPPY/POSITIVE mood.
+
+Guidelines:
+- Match their positive energy with an upbeat, friendly tone
+- Keep responses concise and efficient (they're satisfied, don't over-explain)
+- Use positive language and affirmations
+- Be warm but professional
+- 2-3 sentences maximum""",
+
+    'Neutral': """You are Sadeem, a professional Fuel Card assistant. The user is in a NEUTRAL/CALM mood.
+
+Guidelines:
+- Use clear, professional, factual tone
+- Be direct and informative
+- Focus on accuracy and completeness
+- Avoid unnecessary emotion or flair
+- 2-4 sentences, well-structured""",
+
+    'Confused': """You are Sadeem, a patient and helpful Fuel Card assistant. The user is CONFUSED/UNCERTAIN.
+
+Guidelines:
+- Break down information into simple, clear steps
+- Use numbered lists or bullet points when helpful
+- Provide concrete examples
+- Ask a clarifying question at the end to ensure understanding
+- Be patient and reassuring
+- Avoid jargon, explain technical terms
+- 3-5 sentences with clear structure""",
+
+    'Frustrated': """You are Sadeem, an empathetic and solution-focused Fuel Card assistant. The user is FRUSTRATED/ANGRY.
+
+Guidelines:
+- START with acknowledgment of their frustration (e.g., "I understand this is frustrating...")
+- Be direct and solution-oriented - get to the point quickly
+- Offer specific, actionable steps
+- Show empathy but don't over-apologize
+- If this seems like a recurring issue, suggest escalation or alternative solutions
+- 2-4 sentences, focused on resolution""",
+
+    'Sad': """You are Sadeem, a supportive and encouraging Fuel Card assistant. The user is SAD/DISAPPOINTED.
+
+Guidelines:
+- Use a gentle, supportive tone
+- Acknowledge their feelings briefly
+- Provide reassurance while still being helpful
+- Be encouraging and positive about finding a solution
+- Avoid being overly cheerful (be genuine)
+- 3-4 sentences, warm and understanding"""
+}
+
+# Added to the Frustrated prompt once a session has been frustrated repeatedly
+_ESCALATION_NOTE = "\n\nIMPORTANT: This user has been frustrated multiple times. Offer to escalate to a human representative or provide alternative contact methods."
+
+# Everything in a rewrite prompt before the user's message, per (emotion, escalated)
+_REWRITE_PREFIXES = {
+    (emotion, escalated): (
+        (prompt + _ESCALATION_NOTE if escalated else prompt)
+        + '\n\nUser\'s Message: "'
+    )
+    for emotion, prompt in EMOTION_PROMPTS.items()
+    for escalated in ((False, True) if emotion == 'Frustrated' else (False,))
+}
+
+_REWRITE_TASK = """
+
+Your Task:
+Rewrite the base answer to match the user's emotional state. Keep the factual information but adjust the tone, structure, and approach based on the emotion guidelines above.
+
+Adjusted Response:"""
+
 
 class EmotionResponseAdapter:
     """
@@ -24,18 +103,31 @@ class EmotionResponseAdapter:
     - Sad: Supportive, encouraging, gentle
     """
     
-    def __init__(self, gemini_model=None):
+    EMOTIONS = [e.name for e in Emotion]
+    
+    # Words showing a Sad-user answer already offers support
+    _SAD_MARKERS = ('help', 'here', 'support')
+    
+    def __init__(self, gemini_model=None, cache_size: int = 1024):
         """
         Initialize emotion response adapter
         
         Args:
             gemini_model: Google Generative AI model instance
+            cache_size: Number of recent adapted answers to memoize (0 disables caching)
         """
         self.gemini_model = gemini_model
+        self.cache_size = cache_size
         
         # Track frustration patterns for escalation
         self.frustration_tracker = {}
         
+        # Adapted answers keyed by (emotion, escalated, base answer, user message)
+        self._response_cache = OrderedDict()
+        
+        # Guards the tracker and cache when requests are served concurrently
+        self._lock = threading.Lock()
+        
         logger.info("✓ Emotion response adapter initialized")
     
     def adjust_response_based_on_emotion(
@@ -43,7 +135,8 @@ class EmotionResponseAdapter:
         emotion_label: str,
         base_answer: str,
         user_message: str,
-        conversation_context: Optional[Dict] = None
+        conversation_context: Optional[Dict] = None,
+        confidence: float = 1.0
     ) -> str:
         """
         Adjust response based on detected emotion
@@ -53,44 +146,54 @@ class EmotionResponseAdapter:
             base_answer: Original response from RAG pipeline
             user_message: Original user message
             conversation_context: Optional context (session history, etc.)
+            confidence: Confidence of the detected emotion
             
         Returns:
             Adjusted response with appropriate tone and content
         """
+        # Neutral needs no rewrite, and a tentative Happy only gets a friendly prefix
+        if emotion_label == 'Neutral':
+            return base_answer
+        if emotion_label == 'Happy' and confidence < HAPPY_REWRITE_MIN_CONFIDENCE:
+            return self._simple_emotion_prefix(emotion_label) + base_answer
+        
         if not self.gemini_model:
             logger.warning("Gemini model not available, returning base answer")
             return base_answer
         
         try:
-            # Get emotion-specific prompt
-            system_prompt = self._get_emotion_prompt(emotion_label, conversation_context)
+            # Same emotion, escalation state, answer and message give the same result
+            self._track_frustration(emotion_label, conversation_context)
+            escalated = self._is_escalated(emotion_label, conversation_context)
+            cache_key = (emotion_label, escalated, base_answer, user_message)
+            with self._lock:
+                cached = self._response_cache.get(cache_key)
+                if cached is not None:
+                    self._response_cache.move_to_end(cache_key)
+            if cached is not None:
+                logger.info(f"Response for {emotion_label} emotion served from cache")
+                return cached
+            
+            # Only the message, emotion and answer vary; the rest is precomputed
+            prefix = _REWRITE_PREFIXES.get((emotion_label, escalated), _REWRITE_PREFIXES[('Neutral', False)])
+            full_prompt = (
+                f'{prefix}{user_message}"\nDetected Emotion: {emotion_label}\n\n'
+                f'Base Answer (from knowledge base):\n{base_answer}{_REWRITE_TASK}'
+            )
             
-            # Build full prompt
-            full_prompt = f"""{system_prompt}
-
-User's Message: "{user_message}"
-Detected Emotion: {emotion_label}
-
-Base Answer (from knowledge base):
-{base_answer}
-
-Your Task:
-Rewrite the base answer to match the user's emotional state. Keep the factual information but adjust the tone, structure, and approach based on the emotion guidelines above.
-
-Adjusted Response:"""
-
             # Generate adapted response
             response = self.gemini_model.generate_content(full_prompt)
-            adapted_answer = response.text.strip()
             
             # Add emotion-specific enhancements
             final_answer = self._add_emotion_enhancements(
-                adapted_answer,
+                response.text.strip(),
                 emotion_label,
                 user_message,
                 conversation_context
             )
             
+            self._cache_response(cache_key, final_answer)
+            
             logger.info(f"Response adapted for {emotion_label} emotion")
             return final_answer
             
@@ -99,71 +202,32 @@ Adjusted Response:"""
             # Fallback to base answer with simple prefix
             return self._simple_emotion_prefix(emotion_label) + base_answer
     
-    def _get_emotion_prompt(self, emotion: str, context: Optional[Dict] = None) -> str:
-        """Get emotion-specific system prompt"""
-        
-        prompts = {
-            'Happy': """You are Sadeem, a friendly Fuel Card assistant. The user is in a HAPPY/POSITIVE mood.
-
-Guidelines:
-- Match their positive energy with an upbeat, friendly tone
-- Keep responses concise and efficient (they're satisfied, don't over-explain)
-- Use positive language and affirmations
-- Be warm but professional
-- 2-3 sentences maximum""",
-
-            'Neutral': """You are Sadeem, a professional Fuel Card assistant. The user is in a NEUTRAL/CALM mood.
-
-Guidelines:
-- Use clear, professional, factual tone
-- Be direct and informative
-- Focus on accuracy and completeness
-- Avoid unnecessary emotion or flair
-- 2-4 sentences, well-structured""",
-
-            'Confused': """You are Sadeem, a patient and helpful Fuel Card assistant. The user is CONFUSED/UNCERTAIN.
-
-Guidelines:
-- Break down information into simple, clear steps
-- Use numbered lists or bullet points when helpful
-- Provide concrete examples
-- Ask a clarifying question at the end to ensure understanding
-- Be patient and reassuring
-- Avoid jargon, explain technical terms
-- 3-5 sentences with clear structure""",
-
-            'Frustrated': """You are Sadeem, an empathetic and solution-focused Fuel Card assistant. The user is FRUSTRATED/ANGRY.
-
-Guidelines:
-- START with acknowledgment of their frustration (e.g., "I understand this is frustrating...")
-- Be direct and solution-oriented - get to the point quickly
-- Offer specific, actionable steps
-- Show empathy but don't over-apologize
-- If this seems like a recurring issue, suggest escalation or alternative solutions
-- 2-4 sentences, focused on resolution""",
-
-            'Sad': """You are Sadeem, a supportive and encouraging Fuel Card assistant. The user is SAD/DISAPPOINTED.
-
-Guidelines:
-- Use a gentle, supportive tone
-- Acknowledge their feelings briefly
-- Provide reassurance while still being helpful
-- Be encouraging and positive about finding a solution
-- Avoid being overly cheerful (be genuine)
-- 3-4 sentences, warm and understanding"""
-        }
-        
-        # Check for repeated frustration
-        if emotion == 'Frustrated' and context:
-            session_id = context.get('session_id')
-            if session_id:
-                frustration_count = self.frustration_tracker.get(session_id, 0) + 1
-                self.frustration_tracker[session_id] = frustration_count
-                
-                if frustration_count >= 2:
-                    prompts['Frustrated'] += "\n\nIMPORTANT: This user has been frustrated multiple times. Offer to escalate to a human representative or provide alternative contact methods."
-        
-        return prompts.get(emotion, prompts['Neutral'])
+    def _is_escalated(self, emotion: str, context: Optional[Dict]) -> bool:
+        """Whether repeated frustration in this session calls for escalation"""
+        if emotion != 'Frustrated' or not context:
+            return False
+        session_id = context.get('session_id')
+        return bool(session_id) and self.get_frustration_level(session_id) >= 2
+    
+    def _cache_response(self, key: tuple, answer: str):
+        """Memoize an adapted answer, evicting the least recently used when full"""
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._response_cache[key] = answer
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > self.cache_size:
+                self._response_cache.popitem(last=False)
+    
+    def _track_frustration(self, emotion: str, context: Optional[Dict]):
+        """Count a frustrated message for the session"""
+        if emotion != 'Frustrated' or not context:
+            return
+        session_id = context.get('session_id')
+        if not session_id:
+            return
+        with self._lock:
+            self.frustration_tracker[session_id] = self.frustration_tracker.get(session_id, 0) + 1
     
     def _add_emotion_enhancements(
         self,
@@ -173,6 +237,7 @@ Guidelines:
         context: Optional[Dict]
     ) -> str:
         """Add emotion-specific enhancements to the answer"""
+        answer_lower = answer.lower()
         
         # For Confused users, ensure there's a clarifying question
         if emotion == 'Confused' and '?' not in answer:
@@ -186,15 +251,13 @@ Guidelines:
             answer += clarifying_questions[question_idx]
         
         # For Frustrated users with repeated frustration, add escalation
-        if emotion == 'Frustrated' and context:
-            session_id = context.get('session_id')
-            if session_id and self.frustration_tracker.get(session_id, 0) >= 2:
-                if 'contact' not in answer.lower() and 'representative' not in answer.lower():
-                    answer += "\n\nIf you'd prefer, I can provide contact information for our customer service team who can assist you directly."
+        if self._is_escalated(emotion, context):
+            if 'contact' not in answer_lower and 'representative' not in answer_lower:
+                answer += "\n\nIf you'd prefer, I can provide contact information for our customer service team who can assist you directly."
         
         # For Sad users, add gentle encouragement
         if emotion == 'Sad' and len(answer.split()) > 20:
-            if not any(word in answer.lower() for word in ['help', 'here', 'support']):
+            if not any(word in answer_lower for word in self._SAD_MARKERS):
                 answer += " I'm here to help make this easier for you."
         
         return answer
@@ -212,8 +275,8 @@ Guidelines:
     
     def reset_frustration_tracker(self, session_id: str):
         """Reset frustration tracking for a session"""
-        if session_id in self.frustration_tracker:
-            del self.frustration_tracker[session_id]
+        with self._lock:
+            self.frustration_tracker.pop(session_id, None)
     
     def get_frustration_level(self, session_id: str) -> int:
         """Get current frustration count for a session"""
@@ -0,0 +1,35 @@
+"""
+Shared Gemini client for Sadeem AI Chatbot
+
+A single GenerativeModel is created on first use and reused by every
+component (response generator, emotion detector, response adapter), so
+they all go through the same client and its open connection.
+"""
+
+import logging
+import threading
+import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL_NAME = 'gemini-1.5-flash'
+
+_GEMINI = None
+_GEMINI_LOCK = threading.Lock()
+
+
+def get_gemini():
+    """
+    Get the shared Gemini model, creating it on first call
+
+    Returns:
+        genai.GenerativeModel instance
+    """
+    global _GEMINI
+    if _GEMINI is None:
+        with _GEMINI_LOCK:
+            if _GEMINI is None:
+                _GEMINI = genai.GenerativeModel(GEMINI_MODEL_NAME)
+                logger.info(f"✓ Gemini model created ({GEMINI_MODEL_NAME})")
+    return _GEMINI
+
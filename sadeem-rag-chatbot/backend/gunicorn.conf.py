@@ -0,0 +1,53 @@
+"""
+Gunicorn configuration for the Sadeem chatbot API
+
+Run with:
+    gunicorn -c gunicorn.conf.py app:app
+
+gevent workers let each process keep many chat requests in flight while
+they wait on Gemini, and the API is served on a Unix socket behind nginx.
+"""
+
+import multiprocessing
+import os
+
+# Keep per-request INFO logging off in production unless asked for
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+bind = os.getenv('GUNICORN_BIND', 'unix:/tmp/sadeem.sock')
+
+# Sessions (without Redis), analytics statistics and the semantic cache live in
+# each worker process, so several workers need sessions shared through Redis
+if os.getenv('REDIS_URL'):
+    workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+else:
+    workers = int(os.getenv('WEB_CONCURRENCY', 1))
+    if workers > 1:
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={workers} needs REDIS_URL: without Redis each worker "
+            "keeps its own sessions, so requests landing on another worker lose them"
+        )
+
+# Split the CPU cores between the workers so their torch/BLAS threads do not
+# oversubscribe them; the environment must be set before the workers import torch
+os.environ.setdefault('OMP_NUM_THREADS', str(max(1, multiprocessing.cpu_count() // workers)))
+os.environ.setdefault('MKL_NUM_THREADS', os.environ['OMP_NUM_THREADS'])
+
+worker_class = 'gevent'
+worker_connections = 1000
+keepalive = 15
+loglevel = os.environ['LOG_LEVEL'].lower()
+
+# Model loading can take a while on first start
+timeout = 120
+
+
+def post_worker_init(worker):
+    """Load the models and vector index once per worker process"""
+    import torch
+    from app import initialize_components
+
+    torch.set_num_threads(int(os.environ['OMP_NUM_THREADS']))
+
+    if not initialize_components():
+        worker.log.error("Failed to initialize chatbot components")
@@ -0,0 +1,68 @@
+"""
+Export the emotion classifier to an INT8 ONNX model for EmotionDetector
+
+Uses torch.onnx.export and onnxruntime's dynamic quantization, so it does
+not need optimum. Run as a module from the backend directory:
+
+    python -m scripts.export_emotion_onnx [output_dir]
+
+The model, tokenizer and config are written to output_dir (default
+EMOTION_ONNX_DIR), where EmotionDetector loads them from on startup.
+"""
+
+import os
+import sys
+
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from emotion_detector import EMOTION_MODEL_NAME, EMOTION_ONNX_DIR, EMOTION_ONNX_FILE
+
+ONNX_OPSET = 17
+
+
+def export_emotion_onnx(output_dir: str = EMOTION_ONNX_DIR) -> str:
+    """
+    Export the emotion model to ONNX and quantize its weights to INT8
+
+    Args:
+        output_dir: Directory to write the model, tokenizer and config to
+
+    Returns:
+        Path to the quantized model file
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(EMOTION_MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(EMOTION_MODEL_NAME).eval()
+
+    # Batch size and sequence length stay dynamic so messages can be batched
+    dummy = tokenizer(["What is the fee for the card?"], return_tensors='pt')
+    fp32_path = os.path.join(output_dir, 'model.onnx')
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy['input_ids'], dummy['attention_mask']),
+            fp32_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'}
+            },
+            opset_version=ONNX_OPSET
+        )
+    print(f"✓ Exported FP32 model to {fp32_path}")
+
+    int8_path = os.path.join(output_dir, EMOTION_ONNX_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"✓ Quantized INT8 model to {int8_path}")
+
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    return int8_path
+
+
+if __name__ == '__main__':
+    export_emotion_onnx(sys.argv[1] if len(sys.argv) > 1 else EMOTION_ONNX_DIR)
@@ -0,0 +1,173 @@
+"""
+Semantic Response Cache for Sadeem AI Chatbot
+
+Stores generated answers with an embedding of the message that produced
+them, so a later message with the same meaning (not just the same text)
+can reuse the answer instead of making another Gemini call.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Fixed-size cache of answers looked up by cosine similarity of messages.
+    
+    Each entry belongs to a partition key (the app uses the language);
+    a lookup only matches entries with the same key whose message embedding
+    is at least `threshold` similar to the query. When full, the oldest
+    entry is overwritten.
+    
+    The cache is shared by all users: a message close enough to someone
+    else's gets their answer. That is only safe because the app caches
+    answers built from the message and knowledge base alone, never from
+    session history; keep the threshold high so that differently meant
+    messages do not collide.
+    """
+    
+    def __init__(
+        self,
+        embed_fn: Callable[[str], np.ndarray],
+        threshold: float = 0.92,
+        max_entries: int = 4096,
+        path: Optional[str] = None
+    ):
+        """
+        Initialize semantic cache
+        
+        Args:
+            embed_fn: Function returning the embedding vector of a message
+            threshold: Minimum cosine similarity for a cache hit
+            max_entries: Number of answers kept
+            path: Optional .npz file the cache is loaded from and saved to
+        """
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        self._lock = threading.Lock()
+        
+        # Allocated on the first insert, once the embedding size is known
+        self._matrix = None
+        self._key_ids = np.zeros(max_entries, dtype=np.int64)
+        self._responses = [None] * max_entries
+        self._count = 0
+        
+        if path and os.path.exists(path):
+            self._load()
+    
+    @staticmethod
+    def _key_id(key) -> int:
+        """Stable 64-bit id for a partition key (the same across processes)"""
+        digest = hashlib.blake2s(repr(key).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little', signed=True)
+    
+    def _embed(self, text: str) -> np.ndarray:
+        """Embed a message as a unit-length float32 vector"""
+        vector = np.asarray(self.embed_fn(text), dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def get(self, key, text: str) -> Optional[Any]:
+        """
+        Look up the value cached for a similar message
+        
+        Args:
+            key: Partition key the value must have been stored under
+            text: The user's message
+        
+        Returns:
+            Value passed to put(), or None on a miss
+        """
+        if self._count == 0:
+            return None
+        
+        query = self._embed(text)
+        key_id = self._key_id(key)
+        with self._lock:
+            size = min(self._count, self.max_entries)
+            scores = self._matrix[:size] @ query
+            scores[self._key_ids[:size] != key_id] = -1.0
+            best = int(scores.argmax())
+            if scores[best] < self.threshold:
+                return None
+            logger.info(f"Semantic cache hit (similarity {scores[best]:.3f})")
+            return self._responses[best]
+    
+    def put(self, key, text: str, response: Any):
+        """
+        Cache an answer for a message
+        
+        Args:
+            key: Partition key to store the answer under
+            text: The user's message
+            response: Value to return for similar messages; JSON-serializable
+                if the cache is saved (tuples come back as tuples)
+        """
+        vector = self._embed(text)
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            slot = self._count % self.max_entries
+            self._matrix[slot] = vector
+            self._key_ids[slot] = self._key_id(key)
+            self._responses[slot] = response
+            self._count += 1
+    
+    def save(self):
+        """Write the cache to its file (no-op without a path)"""
+        if not self.path or self._matrix is None:
+            return
+        
+        with self._lock:
+            size = min(self._count, self.max_entries)
+            # Oldest first, so reloading preserves the overwrite order
+            order = np.arange(self._count - size, self._count) % self.max_entries
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                # Write a private file and rename it over the cache, so processes
+                # saving at the same time never leave a half-written file behind
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    np.savez(
+                        f,
+                        matrix=self._matrix[order],
+                        key_ids=self._key_ids[order],
+                        responses=np.array(json.dumps([self._responses[i] for i in order]))
+                    )
+                os.replace(tmp_path, self.path)
+                logger.info(f"✓ Saved {size} semantic cache entries to {self.path}")
+            except Exception as e:
+                logger.warning(f"Could not save semantic cache: {e}")
+    
+    def _load(self):
+        """Load entries saved by save(), oldest first"""
+        try:
+            with np.load(self.path) as data:
+                matrix = data['matrix'][-self.max_entries:]
+                key_ids = data['key_ids'][-self.max_entries:]
+                responses = json.loads(str(data['responses']))[-self.max_entries:]
+            # JSON has no tuples; restore them so callers can unpack as before
+            responses = [tuple(r) if isinstance(r, list) else r for r in responses]
+        except Exception as e:
+            logger.warning(f"Could not load semantic cache from {self.path}: {e}")
+            return
+        
+        size = len(responses)
+        if size == 0:
+            return
+        self._matrix = np.zeros((self.max_entries, matrix.shape[1]), dtype=np.float32)
+        self._matrix[:size] = matrix
+        self._key_ids[:size] = key_ids
+        self._responses[:size] = responses
+        self._count = size
+        logger.info(f"✓ Loaded {size} semantic cache entries from {self.path}")
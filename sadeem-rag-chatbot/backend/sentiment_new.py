@@ -1,4 +1,10 @@
-﻿class SentimentAnalyzer:
+﻿import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+
+class SentimentAnalyzer:
     def __init__(self):
         self.positive_words = {
             'good', 'great', 'excellent', 'amazing', 'love', 'thank', 'thanks', 'thank you',
@@ -14,6 +20,11 @@
             'fail', 'failure', 'dislike'
         }
         
+        # One alternation over the whole lexicon, longest words first so
+        # phrases like 'thank you' win over 'thank'
+        lexicon = sorted(self.positive_words | self.negative_words, key=len, reverse=True)
+        self._lexicon_re = re.compile(r'\b(?:' + '|'.join(map(re.escape, lexicon)) + r')\b')
+        
         self.has_bert = False
         logger.info("✓ Sentiment analyzer initialized (lexicon-only, accurate mode)")
     
@@ -24,15 +35,12 @@
         positive_count = 0
         negative_count = 0
         
-        # Count positive words
-        for word in self.positive_words:
-            if ' ' + word + ' ' in ' ' + text_lower + ' ':
-                positive_count += text_lower.count(word)
-        
-        # Count negative words
-        for word in self.negative_words:
-            if ' ' + word + ' ' in ' ' + text_lower + ' ':
-                negative_count += text_lower.count(word)
+        # Count positive and negative words in a single pass
+        for match in self._lexicon_re.finditer(text_lower):
+            if match.group() in self.positive_words:
+                positive_count += 1
+            else:
+                negative_count += 1
         
         # Determine sentiment
         if positive_count > 0 and positive_count > negative_count:
@@ -3,6 +3,11 @@ Arabic translations for Sadeem Chatbot
 Using Bahraini dialect where appropriate
 """
 
+import sys
+from enum import IntEnum
+from functools import lru_cache
+from types import MappingProxyType
+
 # Knowledge Base Translations (Bahraini dialect)
 SADEEM_KB_AR = {
     "general": {
@@ -109,6 +114,14 @@ UI_TRANSLATIONS_AR = {
     "fallback": "أنا مساعد سديم! أقدر أساعدك في ميزات الكرت، الرسوم، التقديم، القيود، بنفت باي، وأكثر. وش تبي تعرف؟"
 }
 
+class Emotion(IntEnum):
+    """The 5 emotions the chatbot recognizes, in detector output order"""
+    Happy = 0
+    Neutral = 1
+    Confused = 2
+    Frustrated = 3
+    Sad = 4
+
 # Emotion labels in Arabic
 EMOTION_LABELS_AR = {
     "Happy": "سعيد",
@@ -118,14 +131,43 @@ EMOTION_LABELS_AR = {
     "Sad": "حزين"
 }
 
+# Both tables are read-only: expose them as proxies with interned keys
+UI_TRANSLATIONS_AR = MappingProxyType({sys.intern(k): v for k, v in UI_TRANSLATIONS_AR.items()})
+EMOTION_LABELS_AR = MappingProxyType({sys.intern(k): v for k, v in EMOTION_LABELS_AR.items()})
+
+# Emotion labels indexed by Emotion value
+_EMOTION_LABELS_EN = tuple(e.name for e in Emotion)
+_EMOTION_LABELS_AR = tuple(EMOTION_LABELS_AR[e.name] for e in Emotion)
+
+# Lookup tables per language; English (or any unknown language) uses the keys as-is
+_UI_TABLES = {"ar": UI_TRANSLATIONS_AR}
+_EMOTION_TABLES = {"ar": _EMOTION_LABELS_AR}
+_NO_TRANSLATIONS = MappingProxyType({})
+
+@lru_cache(maxsize=2048)
 def get_translation(key: str, language: str = "en") -> str:
     """Get translation for a UI string"""
-    if language == "ar":
-        return UI_TRANSLATIONS_AR.get(key, key)
-    return key
+    return _UI_TABLES.get(language, _NO_TRANSLATIONS).get(key, key)
+
+@lru_cache(maxsize=64)
+def _emotion_label(emotion: Emotion, language: str) -> str:
+    """Cached label lookup for an Emotion member"""
+    return _EMOTION_TABLES.get(language, _EMOTION_LABELS_EN)[emotion]
 
-def get_emotion_label(emotion: str, language: str = "en") -> str:
-    """Get emotion label in specified language"""
-    if language == "ar":
-        return EMOTION_LABELS_AR.get(emotion, emotion)
-    return emotion
+def get_emotion_label(emotion, language: str = "en") -> str:
+    """
+    Get emotion label in specified language
+    
+    Args:
+        emotion: Emotion member (or its name)
+        language: Language code ('en' or 'ar')
+        
+    Returns:
+        Emotion label, or the input unchanged if it is not a known emotion
+    """
+    if not isinstance(emotion, Emotion):
+        if emotion not in Emotion.__members__:
+            return emotion
+        emotion = Emotion[emotion]
+    # Normalize before the cache: 0 and Emotion.Happy are equal keys to lru_cache
+    return _emotion_label(emotion, language)
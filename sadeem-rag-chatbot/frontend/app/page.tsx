@@ -15,7 +15,6 @@ interface Message {
   timestamp: string;
   emotion?: string;
   emotion_confidence?: number;
-  emotion_scores?: Record<string, number>;
   request_rating?: boolean;
 }
 
@@ -129,7 +128,6 @@ export default function ChatPage() {
           timestamp: data.user_message.timestamp,
           emotion: data.user_message.emotion,
           emotion_confidence: data.user_message.emotion_confidence,
-          emotion_scores: data.user_message.emotion_scores,
         },
         {
           id: data.bot_message.id,
@@ -0,0 +1,28 @@
+"""
+Shared pytest configuration for the Sadeem tests
+
+Tests marked @pytest.mark.slow load the real emotion model and are skipped
+unless pytest is run with --run-slow.
+"""
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-slow", action="store_true", default=False,
+        help="run slow tests that load the real models"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: loads real model weights (run with --run-slow)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
@@ -0,0 +1,33 @@
+"""
+Model quality tests for the Sadeem emotion detector
+
+These load the real emotion model, so they only run with --run-slow
+(e.g. in a nightly job).
+"""
+
+import pytest
+
+from emotion_detector import EmotionDetector
+from translations import Emotion
+
+pytestmark = pytest.mark.slow
+
+# (message, accepted emotions)
+QUALITY_CASES = [
+    ("I am so happy with this service! It's amazing!", {Emotion.Happy}),
+    ("This is terrible! I hate this system, it never works!", {Emotion.Frustrated}),
+    # Note: Short questions might be neutral or sometimes surprised depending on model
+    # We accept Neutral or Confused for questions
+    ("What is the fee for the card?", {Emotion.Neutral, Emotion.Confused}),
+]
+
+@pytest.fixture(scope="module")
+def quality_results():
+    """Results for all QUALITY_CASES from the real model, loaded once"""
+    detector = EmotionDetector(use_gemini_fallback=False)
+    return {text: detector.detect_emotion(text) for text, _ in QUALITY_CASES}
+
+@pytest.mark.parametrize("text,expected", QUALITY_CASES, ids=["happy", "frustrated", "neutral"])
+def test_emotion_detection_quality(quality_results, text, expected):
+    """Test the real model's emotion for each message"""
+    assert quality_results[text]['emotion'] in expected
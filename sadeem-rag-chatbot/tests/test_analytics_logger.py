@@ -0,0 +1,170 @@
+"""
+Tests for the background-writing analytics logger
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from analytics_logger import AnalyticsLogger
+
+@pytest.fixture
+def analytics(tmp_path):
+    """Analytics logger writing to a temporary file"""
+    analytics = AnalyticsLogger(log_file=str(tmp_path / "analytics.jsonl"))
+    yield analytics
+    analytics.close()
+
+def _log(analytics, session_id="s1"):
+    """Log one neutral message for a session"""
+    analytics.log_message(session_id, "What is the fee?", {'label': 'Neutral', 'confidence': 0.9}, 0.1)
+
+def test_recent_logs_include_queued_entries(analytics):
+    """Test that reads see entries still waiting for the writer thread"""
+    _log(analytics, "s1")
+    _log(analytics, "s2")
+
+    assert [e['session_id'] for e in analytics.get_recent_logs()] == ["s2", "s1"]
+    assert analytics._unflushed_bytes == 0
+
+def test_flush_wait_is_bounded(analytics):
+    """Test that flush() gives up instead of blocking on a stuck writer"""
+    release = threading.Event()
+    build_entry = analytics._build_entry
+
+    def slow_build_entry(*raw):
+        release.wait()
+        return build_entry(*raw)
+
+    with patch.object(analytics, '_build_entry', side_effect=slow_build_entry):
+        _log(analytics)
+        start = time.monotonic()
+        assert analytics.flush(timeout=0.05) is False
+        assert time.monotonic() - start < 1.0
+
+        release.set()
+        assert analytics.flush() is True
+
+    assert len(analytics.get_recent_logs()) == 1
+
+def _binary_analytics(tmp_path):
+    """Analytics logger that also writes the MessagePack log"""
+    pytest.importorskip("msgpack")
+    return AnalyticsLogger(
+        log_file=str(tmp_path / "analytics.jsonl"),
+        binary_log_file=str(tmp_path / "analytics.mpk")
+    )
+
+def test_torn_binary_frame_falls_back_to_jsonl(tmp_path):
+    """Test that a partly written binary record does not hide the log"""
+    analytics = _binary_analytics(tmp_path)
+    _log(analytics, "s1")
+    _log(analytics, "s2")
+    analytics.close()
+    with open(tmp_path / "analytics.mpk", 'ab') as f:
+        f.write(b"\x07\x00")
+
+    analytics = _binary_analytics(tmp_path)
+    try:
+        assert [e['session_id'] for e in analytics.get_recent_logs()] == ["s2", "s1"]
+        assert analytics.get_emotion_statistics()['total_messages'] == 2
+    finally:
+        analytics.close()
+
+def test_binary_log_added_to_existing_history(tmp_path):
+    """Test that enabling the binary log later still reads the full JSONL history"""
+    analytics = AnalyticsLogger(log_file=str(tmp_path / "analytics.jsonl"))
+    _log(analytics, "s1")
+    analytics.close()
+
+    analytics = _binary_analytics(tmp_path)
+    try:
+        _log(analytics, "s2")
+        assert [e['session_id'] for e in analytics.get_recent_logs()] == ["s2", "s1"]
+    finally:
+        analytics.close()
+
+def test_binary_log_used_when_complete(tmp_path):
+    """Test that a binary log covering the whole history is read back"""
+    analytics = _binary_analytics(tmp_path)
+    _log(analytics, "s1")
+    analytics.close()
+
+    analytics = _binary_analytics(tmp_path)
+    try:
+        assert analytics._binary_reads
+        assert [e['session_id'] for e in analytics.get_recent_logs()] == ["s1"]
+    finally:
+        analytics.close()
+
+def test_numpy_values_are_logged(tmp_path):
+    """Test that numpy confidences and scores reach both logs"""
+    analytics = _binary_analytics(tmp_path)
+    try:
+        analytics.log_message(
+            "s1", "Hi", {'label': 'Happy', 'confidence': np.float32(0.9), 'scores': np.array([0.9, 0.1], dtype=np.float32)}, 0.1
+        )
+        analytics.flush()
+
+        assert analytics._binary_reads
+        [entry] = analytics.get_recent_logs()
+        assert entry['emotion'] == {'label': 'Happy', 'confidence': 0.9, 'scores': {'Happy': 0.9, 'Neutral': 0.1}}
+        assert (tmp_path / "analytics.jsonl").stat().st_size > 0
+    finally:
+        analytics.close()
+
+def test_array_scores_keep_label_schema():
+    """Test that numpy scores are logged as a label -> score dict without float32 noise"""
+    scores = AnalyticsLogger._round_scores(np.array([0.123, 0.2, 0.0, 0.677, 0.0], dtype=np.float32))
+
+    assert scores == {'Happy': 0.123, 'Neutral': 0.2, 'Confused': 0.0, 'Frustrated': 0.677, 'Sad': 0.0}
+    assert AnalyticsLogger._round_scores({'Happy': np.float32(0.123)}) == {'Happy': 0.123}
+
+def _log_emotion(analytics, session_id, label, confidence, response_time):
+    """Log one message with the given emotion and response time (seconds)"""
+    analytics.log_message(session_id, "Hi", {'label': label, 'confidence': confidence}, response_time)
+
+def test_statistics_roll_over_window(analytics):
+    """Test that statistics only cover the last STATS_WINDOW messages"""
+    with patch("analytics_logger.STATS_WINDOW", 3):
+        _log_emotion(analytics, "s1", "Sad", 0.5, 0.4)
+        _log_emotion(analytics, "s2", "Happy", 0.9, 0.1)
+        _log_emotion(analytics, "s2", "Happy", 0.7, 0.2)
+        _log_emotion(analytics, "s3", "Neutral", 0.8, 0.3)
+
+    stats = analytics.get_emotion_statistics()
+    assert stats['total_messages'] == 3
+    assert stats['emotion_counts'] == {'Happy': 2, 'Neutral': 1}
+    assert stats['avg_response_time_ms'] == pytest.approx(200.0)
+    assert stats['avg_confidence'] == pytest.approx(0.8)
+    assert analytics.get_emotion_statistics("s1")['total_messages'] == 0
+    assert analytics.get_emotion_statistics("s2")['emotion_percentages'] == {'Happy': 100.0}
+
+def test_statistics_rebuilt_from_log(tmp_path):
+    """Test that a new logger starts with the statistics of the existing log"""
+    analytics = AnalyticsLogger(log_file=str(tmp_path / "analytics.jsonl"))
+    _log_emotion(analytics, "s1", "Sad", 0.6, 0.2)
+    _log_emotion(analytics, "s2", "Happy", 0.8, 0.4)
+    before = analytics.get_emotion_statistics()
+    analytics.close()
+
+    analytics = AnalyticsLogger(log_file=str(tmp_path / "analytics.jsonl"))
+    try:
+        assert analytics.get_emotion_statistics() == before
+        assert analytics.get_emotion_statistics("s1")['emotion_counts'] == {'Sad': 1}
+    finally:
+        analytics.close()
+
+def test_tail_lines_across_blocks(analytics):
+    """Test that reading backwards in small blocks returns whole lines, newest first"""
+    analytics.close()
+    with open(analytics.log_file, 'wb') as f:
+        f.write(b'{"n": 1}\n\n{"n": 2, "pad": "' + b'x' * 40 + b'"}\n{"n": 3}')
+
+    with patch("analytics_logger.TAIL_CHUNK_SIZE", 8):
+        assert analytics._tail_lines(2) == [b'{"n": 3}', b'{"n": 2, "pad": "' + b'x' * 40 + b'"}']
+        assert len(analytics._tail_lines(10)) == 3
+        assert analytics._tail_lines(0) == []
@@ -0,0 +1,48 @@
+"""
+Tests for request validation in the chat API routes
+"""
+
+import pytest
+
+from app import app
+
+@pytest.fixture
+def client():
+    """Flask test client"""
+    return app.test_client()
+
+@pytest.mark.parametrize("kwargs", [
+    {'data': "not json", 'content_type': 'text/plain'},
+    {'data': "null", 'content_type': 'application/json'},
+    {'json': ["a", "list"]},
+    {'json': {'session_id': "abc", 'message': 42}},
+])
+def test_stream_rejects_bad_body(client, kwargs):
+    """Test that the streaming endpoint answers malformed bodies with the JSON error shape"""
+    response = client.post('/api/chat/message/stream', **kwargs)
+
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': 'Missing data'}
+
+@pytest.mark.parametrize("kwargs", [
+    {'data': "not json", 'content_type': 'text/plain'},
+    {'data': "null", 'content_type': 'application/json'},
+])
+def test_message_rejects_bad_body(client, kwargs):
+    """Test that a malformed chat message body is a 400, not a 500"""
+    response = client.post('/api/chat/message', **kwargs)
+
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': 'Missing data'}
+
+@pytest.mark.parametrize("kwargs", [
+    {'data': "not json", 'content_type': 'text/plain'},
+    {'data': "null", 'content_type': 'application/json'},
+    {'json': {'rating': "5"}},
+])
+def test_rating_rejects_bad_body(client, kwargs):
+    """Test that a malformed rating body is a 400, not a 500"""
+    response = client.post('/api/session/abc/rating', **kwargs)
+
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': 'Invalid rating'}
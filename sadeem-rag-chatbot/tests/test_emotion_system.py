@@ -2,45 +2,73 @@
 Test script for Sadeem AI Emotion System
 """
 
-import sys
-import os
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, create_autospec, patch
 
-# Add backend to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '../backend'))
+import google.generativeai as genai
+import numpy as np
+import pytest
 
 from emotion_detector import EmotionDetector
 from emotion_response_adapter import EmotionResponseAdapter
+from translations import Emotion
+
+# The model itself is mocked here; tests/slow/test_emotion_quality.py runs the real one.
+# Each message contains a keyword choosing the 7-class label the mock predicts for it
+_MOCK_HF_LABELS = {"happy": "joy", "terrible": "anger", "fee": "neutral", "scared": "fear"}
+
+# (message, expected emotion)
+DETECTION_CASES = [
+    ("I am so happy with this service! It's amazing!", Emotion.Happy),
+    ("This is terrible! I hate this system, it never works!", Emotion.Frustrated),
+    ("What is the fee for the card?", Emotion.Neutral),
+    ("I'm scared I will lose my balance", Emotion.Confused),
+]
+
+def _mock_probabilities(texts):
+    """Stand-in for the model: (batch, 7) probabilities favouring each message's keyword label"""
+    probs = np.full((len(texts), len(EmotionDetector.HF_LABELS)), 0.02)
+    for row, text in enumerate(texts):
+        label = next(hf for word, hf in _MOCK_HF_LABELS.items() if word in text.lower())
+        probs[row, EmotionDetector.HF_LABELS.index(label)] = 0.88
+    return probs
+
+@pytest.fixture(scope="session")
+def detector():
+    """Emotion detector with the model replaced by _mock_probabilities (nothing is loaded)"""
+    with patch("emotion_detector.load_onnx_emotion_model", side_effect=FileNotFoundError), \
+            patch("emotion_detector.load_emotion_pipeline", return_value=MagicMock()):
+        detector = EmotionDetector(use_gemini_fallback=False, cache_size=0)
+    detector._predict_pipeline = _mock_probabilities
+    return detector
+
+@pytest.fixture(scope="session")
+def detection_results(detector):
+    """Results for all DETECTION_CASES"""
+    return {text: detector.detect_emotion(text) for text, _ in DETECTION_CASES}
+
+@pytest.mark.parametrize("text,expected", DETECTION_CASES, ids=["happy", "frustrated", "neutral", "fear"])
+def test_emotion_detection(detection_results, text, expected):
+    """Test that each model label is routed to the right emotion"""
+    result = detection_results[text]
+    assert result['emotion'] == expected
+    assert result['label'] == expected.name
+    # Classes mapping to the same emotion add up (e.g. anger + disgust)
+    assert result['confidence'] >= 0.88
 
 class TestEmotionSystem(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # One Gemini mock for the whole class, reset before each test
+        cls._gemini = create_autospec(genai.GenerativeModel, instance=True)
+    
     def setUp(self):
-        self.detector = EmotionDetector(use_gemini_fallback=False)
-        self.adapter = EmotionResponseAdapter(gemini_model=MagicMock())
-        
-    def test_emotion_detection_happy(self):
-        """Test detection of happy emotion"""
-        text = "I am so happy with this service! It's amazing!"
-        result = self.detector._detect_with_hf_model(text)
-        self.assertEqual(result['label'], 'Happy')
-        
-    def test_emotion_detection_frustrated(self):
-        """Test detection of frustrated emotion"""
-        text = "This is terrible! I hate this system, it never works!"
-        result = self.detector._detect_with_hf_model(text)
-        self.assertEqual(result['label'], 'Frustrated')
-        
-    def test_emotion_detection_neutral(self):
-        """Test detection of neutral emotion"""
-        text = "What is the fee for the card?"
-        result = self.detector._detect_with_hf_model(text)
-        # Note: Short questions might be neutral or sometimes surprised depending on model
-        # We accept Neutral or Confused for questions
-        self.assertIn(result['label'], ['Neutral', 'Confused'])
+        self._gemini.reset_mock()
+        self.adapter = EmotionResponseAdapter(gemini_model=self._gemini)
 
     def test_response_adaptation_frustrated(self):
         """Test response adaptation for frustrated user"""
-        emotion = "Frustrated"
+        emotion = Emotion.Frustrated.name
         base_answer = "The fee is BD 3.300."
         user_message = "Why is this so expensive?"
         context = {'session_id': 'test-session'}
@@ -57,7 +85,7 @@ class TestEmotionSystem(unittest.TestCase):
         
     def test_response_adaptation_confused(self):
         """Test response adaptation for confused user"""
-        emotion = "Confused"
+        emotion = Emotion.Confused.name
         base_answer = "Use the app."
         user_message = "How do I use this?"
         context = {'session_id': 'test-session'}
@@ -72,5 +100,16 @@ class TestEmotionSystem(unittest.TestCase):
         # Check if clarifying question is added
         self.assertTrue("?" in response)
 
+    def test_response_adaptation_neutral_skips_gemini(self):
+        """Test that neutral messages keep the base answer without a Gemini call"""
+        base_answer = "The fee is BD 3.300."
+        
+        response = self.adapter.adjust_response_based_on_emotion(
+            Emotion.Neutral.name, base_answer, "What is the fee?", {'session_id': 'test-session'}
+        )
+        
+        self.assertEqual(response, base_answer)
+        self.adapter.gemini_model.generate_content.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for the combined Gemini response generator
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import ResponseGenerator
+from semantic_cache import SemanticCache
+
+@pytest.fixture
+def generator():
+    """Response generator with a mocked vector store and Gemini model"""
+    vector_store = MagicMock()
+    vector_store.search.return_value = ["The card fee is BD 3.300."]
+    generator = ResponseGenerator(vector_store)
+    generator.gemini_model = MagicMock()
+    generator.has_gemini = True
+    return generator
+
+def _stream(generator, chunks):
+    """Run generate_stream over mocked Gemini chunks; returns (chunk texts, done payload)"""
+    generator.gemini_model.generate_content.return_value = [MagicMock(text=text) for text in chunks]
+    events = list(generator.generate_stream("What is the fee?"))
+    return [payload for kind, payload in events if kind == 'chunk'], events[-1][1]
+
+def _with_semantic_cache(generator):
+    """Attach a semantic cache over fixed query embeddings"""
+    vectors = {
+        "What is the fee?": [1.0, 0.0],
+        "How much is the fee?": [0.99, 0.05],
+        "How do I apply?": [0.0, 1.0],
+    }
+    generator.semantic_cache = SemanticCache(embed_fn=vectors.get)
+
+def test_stream_header_split_at_marker(generator):
+    """Test that a chunk ending right at RESPONSE: does not leak the header"""
+    chunks, done = _stream(generator, ["EMOTION: Happy\nCONFIDENCE: 0.9\nRESPONSE:", " Hello there!"])
+
+    assert chunks == ["Hello there!"]
+    assert done[:3] == ("Hello there!", "Happy", 0.9)
+
+def test_stream_marker_without_body_uses_fallback(generator):
+    """Test that a stream ending at RESPONSE: falls back instead of sending the header"""
+    chunks, done = _stream(generator, ["EMOTION: Happy\nCONFIDENCE: 0.9\nRESPONSE:"])
+
+    assert "RESPONSE:" not in "".join(chunks)
+    assert "EMOTION:" not in done[0]
+
+def test_parse_multiline_response(generator):
+    """Test that the whole multi-line RESPONSE body is kept"""
+    result = "EMOTION: Confused\nCONFIDENCE: 0.7\nRESPONSE: Step 1: download the app.\nStep 2: log in.\n\nRESPONSE: is just a word here."
+
+    assert generator._parse_result(result) == (
+        "Confused", 0.7, "Step 1: download the app.\nStep 2: log in.\n\nRESPONSE: is just a word here."
+    )
+
+def test_parse_missing_confidence(generator):
+    """Test that a missing CONFIDENCE line keeps the emotion and the default confidence"""
+    assert generator._parse_result("EMOTION: Sad\nRESPONSE: Sorry to hear that.") == (
+        "Sad", 0.0, "Sorry to hear that."
+    )
+
+def test_parse_arabic_emotion(generator):
+    """Test that Arabic emotion labels map back to English"""
+    assert generator._parse_result("EMOTION: محبط\nCONFIDENCE: 0.8\nRESPONSE: مسامحة")[:2] == ("Frustrated", 0.8)
+
+def test_parse_empty_body(generator):
+    """Test that an empty RESPONSE body stays empty instead of returning the header"""
+    assert generator._parse_result("EMOTION: Happy\nCONFIDENCE: 0.9\nRESPONSE:") == ("Happy", 0.9, "")
+
+def test_parse_without_marker(generator):
+    """Test that output without RESPONSE: is used as the answer as-is"""
+    assert generator._parse_result("Just an answer.") == ("Neutral", 0.0, "Just an answer.")
+
+def test_semantic_cache_reuses_similar_query(generator):
+    """Test that a similarly worded query reuses the answer without a Gemini call"""
+    _with_semantic_cache(generator)
+    generator.gemini_model.generate_content.return_value.text = "EMOTION: Neutral\nCONFIDENCE: 0.8\nRESPONSE: The fee is BD 3.300."
+    
+    first = generator.generate("What is the fee?")
+    second = generator.generate("How much is the fee?")
+    generator.generate("How do I apply?")
+    
+    assert second == first == ("The fee is BD 3.300.", "Neutral", 0.8, False)
+    assert generator.gemini_model.generate_content.call_count == 2
+
+def test_semantic_cache_shared_with_stream(generator):
+    """Test that a streamed answer is cached and served to a similar query"""
+    _with_semantic_cache(generator)
+    _stream(generator, ["EMOTION: Confused\nCONFIDENCE: 0.7\nRESPONSE: The fee", " is BD 3.300."])
+    
+    events = list(generator.generate_stream("How much is the fee?"))
+    
+    assert events == [
+        ('chunk', "The fee is BD 3.300."),
+        ('done', ("The fee is BD 3.300.", "Confused", 0.7, False)),
+    ]
+    assert generator.gemini_model.generate_content.call_count == 1
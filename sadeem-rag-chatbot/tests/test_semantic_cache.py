@@ -0,0 +1,35 @@
+"""
+Tests for the semantic response cache
+"""
+
+import numpy as np
+
+from semantic_cache import SemanticCache
+
+_VECTORS = {
+    "what is the fee": [1.0, 0.0, 0.0],
+    "how much is the fee": [0.99, 0.1, 0.0],
+    "where is the station": [0.0, 1.0, 0.0],
+}
+
+def _cache(path=None):
+    """Cache over a fixed toy embedding"""
+    return SemanticCache(lambda text: np.array(_VECTORS[text]), path=path)
+
+def test_similar_message_hits_within_key():
+    """Test that a similar message hits only under the key it was stored with"""
+    cache = _cache()
+    cache.put("en", "what is the fee", ("Neutral", 0.9, "It is 2 BHD."))
+
+    assert cache.get("en", "how much is the fee") == ("Neutral", 0.9, "It is 2 BHD.")
+    assert cache.get("ar", "how much is the fee") is None
+    assert cache.get("en", "where is the station") is None
+
+def test_save_and_load_keep_tuples(tmp_path):
+    """Test that cached tuples are still tuples after a save/load round-trip"""
+    path = str(tmp_path / "cache.npz")
+    cache = _cache(path)
+    cache.put("en", "what is the fee", ("Neutral", 0.9, "It is 2 BHD."))
+    cache.save()
+
+    assert _cache(path).get("en", "how much is the fee") == ("Neutral", 0.9, "It is 2 BHD.")
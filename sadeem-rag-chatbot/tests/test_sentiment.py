@@ -0,0 +1,49 @@
+"""
+Tests for the lexicon-based sentiment analyzer
+"""
+
+import pytest
+
+from sentiment_new import SentimentAnalyzer
+
+@pytest.fixture(scope="module")
+def analyzer():
+    """Shared sentiment analyzer"""
+    return SentimentAnalyzer()
+
+@pytest.mark.parametrize("text,expected", [
+    ("Great service, thank you!", 'positive'),
+    ("This is TERRIBLE and the app is broken", 'negative'),
+    ("Good card but awful support and a useless app", 'negative'),
+    ("Good but bad", 'neutral'),
+    ("What is the fee?", 'neutral'),
+    ("", 'neutral'),
+])
+def test_sentiment(analyzer, text, expected):
+    """Test that positive and negative words are counted against each other"""
+    assert analyzer.analyze(text) == expected
+
+@pytest.mark.parametrize("text,expected", [
+    # Lexicon words inside longer words do not count
+    ("Where do I show my badge?", 'neutral'),
+    ("The sadness of goodbyes", 'neutral'),
+    # 'unhappy' is negative on its own, not 'happy' with a prefix
+    ("I am unhappy", 'negative'),
+])
+def test_whole_words_only(analyzer, text, expected):
+    """Test that matches respect word boundaries"""
+    assert analyzer.analyze(text) == expected
+
+def test_phrase_wins_over_its_prefix(analyzer):
+    """Test that 'thank you' is matched as one phrase rather than as 'thank'"""
+    assert analyzer._lexicon_re.findall("thank you so much") == ["thank you"]
+
+@pytest.mark.parametrize("text,expected", [
+    ("أريد معرفة رسوم البطاقة", 'neutral'),
+    ("الخدمة great جداً", 'positive'),
+    # Arabic letters are word characters, so a lexicon word glued to them is not a match
+    ("goodبطاقة", 'neutral'),
+])
+def test_arabic_text(analyzer, text, expected):
+    """Test that Arabic text is handled and bounds English matches like any other word characters"""
+    assert analyzer.analyze(text) == expected
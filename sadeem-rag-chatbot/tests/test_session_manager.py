@@ -0,0 +1,104 @@
+"""
+Tests for the in-process and Redis-backed session stores
+"""
+
+from unittest.mock import MagicMock, call
+
+import pytest
+
+from app import RedisSessionManager, SessionManager
+
+def test_add_message_refreshes_both_keys():
+    """Test that a new message extends the session hash's expiry along with its messages"""
+    client = MagicMock()
+    client.exists.return_value = 1
+    sessions = RedisSessionManager(client, ttl_seconds=60)
+
+    sessions.add_message("abc", {'text': "Hi"})
+
+    pipe = client.pipeline.return_value
+    pipe.expire.assert_has_calls([call("sess:abc", 60), call("sess:abc:msgs", 60)], any_order=True)
+    pipe.execute.assert_called_once()
+
+def test_active_session_outlives_ttl():
+    """Test that in-process sessions expire after inactivity, not after creation"""
+    sessions = SessionManager(ttl_seconds=3600)
+    idle = sessions.create_session()
+    active = sessions.create_session()
+    # Both sessions were created two hours ago
+    sessions._created_ms[:2] -= 2 * 3600 * 1000
+    sessions._active_ms[:2] -= 2 * 3600 * 1000
+
+    sessions.add_message(active, {'text': "Hi"})
+
+    assert sessions.expire_older_than(3600) == 1
+    assert sessions.get_session(idle) is None
+    assert sessions.get_session(active)['messages'] == [{'text': "Hi"}]
+
+def test_session_round_trip():
+    """Test that an in-process session keeps its messages and rating"""
+    sessions = SessionManager(max_messages=2)
+    session_id = sessions.create_session()
+
+    for text in ("one", "two", "three"):
+        sessions.add_message(session_id, {'text': text})
+    sessions.add_rating(session_id, 4)
+
+    session = sessions.get_session(session_id)
+    assert session['messages'] == [{'text': "two"}, {'text': "three"}]
+    assert session['rating'] == 4
+    assert sessions.get_session("missing") is None
+
+def test_sessions_survive_growth_and_compaction():
+    """Test that sessions keep their data when the arrays grow and expiry compacts them"""
+    sessions = SessionManager(ttl_seconds=3600)
+    ids = [sessions.create_session() for _ in range(100)]
+    for i, session_id in enumerate(ids):
+        sessions.add_message(session_id, {'text': str(i)})
+        sessions.add_rating(session_id, i % 5 + 1)
+    # Every even session has been idle for two hours
+    sessions._active_ms[0:100:2] -= 2 * 3600 * 1000
+
+    assert sessions.expire_older_than(3600) == 50
+    assert sessions.expire_older_than(3600) == 0
+    for i, session_id in enumerate(ids):
+        session = sessions.get_session(session_id)
+        if i % 2 == 0:
+            assert session is None
+        else:
+            assert session['messages'] == [{'text': str(i)}]
+            assert session['rating'] == i % 5 + 1
+
+    # New sessions reuse the freed slots without disturbing the survivors
+    new_id = sessions.create_session()
+    assert sessions.get_session(new_id)['messages'] == []
+    assert sessions.get_session(new_id)['rating'] is None
+    assert sessions.get_session(ids[99])['messages'] == [{'text': "99"}]
+
+def test_redis_session_round_trip():
+    """Test that a Redis session keeps its messages, rating and expiry"""
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    sessions = RedisSessionManager(client, ttl_seconds=60, max_messages=2)
+    session_id = sessions.create_session()
+
+    for text in ("one", "two", "مرحبا"):
+        sessions.add_message(session_id, {'text': text})
+    sessions.add_rating(session_id, 5)
+
+    session = sessions.get_session(session_id)
+    assert session['messages'] == [{'text': "two"}, {'text': "مرحبا"}]
+    assert session['rating'] == 5
+    assert 0 < client.ttl(f"sess:{session_id}:msgs") <= 60
+
+def test_redis_unknown_session_is_ignored():
+    """Test that messages and ratings for a missing Redis session create nothing"""
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    sessions = RedisSessionManager(client)
+
+    sessions.add_message("missing", {'text': "Hi"})
+    sessions.add_rating("missing", 3)
+
+    assert sessions.get_session("missing") is None
+    assert client.keys() == []
@@ -0,0 +1,27 @@
+"""
+Tests for the translation helpers
+"""
+
+import pytest
+
+from translations import Emotion, get_emotion_label
+
+# (emotion, language, expected label); 0 is not a label name, so it comes back as is
+_CALLS = [
+    (0, "en", 0),
+    (Emotion.Happy, "en", "Happy"),
+    ("Happy", "ar", "سعيد"),
+    (Emotion.Happy, "ar", "سعيد"),
+    (0, "ar", 0),
+]
+
+@pytest.mark.parametrize("calls", [_CALLS, _CALLS[::-1]], ids=["int-first", "enum-first"])
+def test_emotion_label_cache_keeps_types_apart(calls):
+    """Test that 0, Emotion.Happy and 'Happy' get their own answers whatever the call order"""
+    for emotion, language, expected in calls:
+        label = get_emotion_label(emotion, language)
+        assert label == expected and type(label) is type(expected)
+
+def test_unknown_emotion_returned_unchanged():
+    """Test that an unknown label comes back as given"""
+    assert get_emotion_label("Bored", "ar") == "Bored"
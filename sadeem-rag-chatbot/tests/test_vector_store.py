@@ -0,0 +1,59 @@
+"""
+Tests for the int8 in-memory vector store
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app import VectorStore, quantize_embeddings
+
+def _embedding(text):
+    """Deterministic unit vector standing in for a document's embedding"""
+    rng = np.random.default_rng(sum(text.encode('utf-8')) * 7919 + len(text))
+    vector = rng.standard_normal(32).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+@pytest.fixture
+def store():
+    """Vector store over the real knowledge base with fake embeddings"""
+    with patch("app.encode_documents", side_effect=lambda texts: np.stack([_embedding(t) for t in texts])), \
+            patch("app.get_embedder"), \
+            patch("torch.cuda.is_available", return_value=False):
+        yield VectorStore()
+
+def test_quantized_rows_approximate_embeddings():
+    """Test that int8 rows times their scales reproduce the float embeddings"""
+    embeddings = np.stack([_embedding("a"), _embedding("b"), np.zeros(32, dtype=np.float32)])
+    matrix, scales = quantize_embeddings(embeddings)
+
+    assert matrix.dtype == np.int8 and scales.dtype == np.float32
+    np.testing.assert_allclose(matrix * scales[:, None], embeddings, atol=0.01)
+
+def test_search_ranks_matching_document_first(store):
+    """Test that a query embedded like a document returns that document first"""
+    target = store._partitions['en']['documents'][5]
+    with patch("app.encode_query", return_value=_embedding(target)):
+        results = store.search("anything", k=3, language="en")
+
+    assert results[0] == target
+    assert len(results) == 3
+
+def test_search_stays_within_language(store):
+    """Test that a search only returns documents in the requested language"""
+    arabic = set(store._partitions['ar']['documents'])
+    english_doc = store._partitions['en']['documents'][0]
+    with patch("app.encode_query", return_value=_embedding(english_doc)):
+        results = store.search("anything", k=5, language="ar")
+
+    assert len(results) == 5
+    assert set(results) <= arabic
+
+def test_search_caps_k_at_partition_size(store):
+    """Test that asking for more documents than exist returns them all, ranked"""
+    size = len(store._partitions['en']['documents'])
+    with patch("app.encode_query", return_value=_embedding("query")):
+        results = store.search("anything", k=size + 10, language="en")
+
+    assert sorted(results) == sorted(store._partitions['en']['documents'])